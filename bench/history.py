@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+'''
+History reverse search speed and correctness\n
+python -m bench.history [--entries N]
+'''
+# Imports
+import os
+import tempfile
+from argparse import ArgumentParser
+from time import perf_counter
+
+from data.history import History
+
+
+# Functions
+def check() -> bool:
+    '''
+    Stepping back through the matches visits each one once, newest first,
+    and stops with (None, None) past the oldest entry
+    '''
+    with tempfile.TemporaryDirectory() as folder:
+        history = History(os.path.join(folder, '.history'))
+        for x in ['a', 'latest', 'b', 'again']:
+            history.append(x)
+        seen = []
+        match_id, match = history.search('a')
+        while match_id is not None and len(seen) <= len(history):
+            seen.append((match_id, match))
+            match_id, match = history.search('a', match_id)
+        history._pending = []
+        return seen == [(3, 'again'), (1, 'latest'), (0, 'a')] and history.search('a', 0) == (None, None)
+
+def run(entries: int = 100000, repeat: int = 100) -> dict:
+    '''
+    Searches per second over entries lines, query only matching the oldest one
+    '''
+    with tempfile.TemporaryDirectory() as folder:
+        history = History(os.path.join(folder, '.history'), max_entries=entries)
+        history.append('needle')
+        for i in range(entries - 1):
+            history.append(f'search name=crackme{i} difficulty=3')
+        history._pending = []
+        start = perf_counter()
+        for _ in range(repeat):
+            history.search('needle')
+        elapsed = perf_counter() - start
+    return {
+        'entries': entries,
+        'searches_per_second': repeat / elapsed if elapsed else 0,
+        'correct': check()
+    }
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='history search benchmark')
+    parser.add_argument('--entries', type=int, default=100000, help='number of history entries')
+    args = parser.parse_args()
+
+    result = run(args.entries)
+    print(f'search    {result['searches_per_second']:>10.0f} searches/s over {result['entries']} entries  {'correct' if result['correct'] else 'WRONG'}')
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+'''
+Compare the search page parser backends and check the detail page parser\n
+python -m bench.parse [--repeat N] [--scale N]
+'''
+# Imports
+import os
+from argparse import ArgumentParser
+from time import perf_counter
+
+from data.config import ConfigManager
+from data.crackme import CrackmeManager
+from data.parser import BACKENDS, HAS_LXML, get_backend
+
+# Constants
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'search.html')
+DETAIL_FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'detail.html')
+DETAIL_URL = 'https://crackmes.one/crackme/0000000000000004538453d7'
+# What _parse_info has to get out of DETAIL_FIXTURE
+DETAIL_EXPECTED = {
+    'filehash': '0000000000000004538453d7', 'name': 'stub crackme 7', 'url': DETAIL_URL,
+    'download_url': 'https://crackmes.one/static/crackme/0000000000000004538453d7.zip', 'filename': '0000000000000004538453d7.zip',
+    'user': 'author_7', 'user_url': 'https://crackmes.one/user/author_7', 'language': 'Assembler', 'arch': 'MIPS',
+    'difficulty': 1.7, 'quality': 1.7, 'os': 'Multiplatform', 'size': 8192, 'date': '1:00 PM 01/01/2020',
+    'downloads': 49, 'solutions': 2, 'comments': 7
+}
+FIELDS = [
+    'name', 'url', 'download_url', 'filename', 'filehash', 'user', 'user_url', 'language', 'arch',
+    'difficulty', 'quality', 'os', 'size', 'date', 'downloads', 'solutions', 'comments'
+]
+
+
+# Functions
+def load_fixture(scale: int = 1) -> str:
+    '''
+    Load the recorded search page, rows are repeated scale times
+    '''
+    with open(FIXTURE, 'r', encoding='utf-8') as f:
+        raw_html = f.read()
+    if scale <= 1:
+        return raw_html
+    head, rest = raw_html.split('<tbody>', 1)
+    body, tail = rest.split('</tbody>', 1)
+    return head + '<tbody>' + body * scale + '</tbody>' + tail
+
+def snapshot(result) -> list:
+    return [tuple(getattr(x, field) for field in FIELDS) for x in result]
+
+def bench_backend(manager: CrackmeManager, backend: str, raw_html: str, repeat: int) -> dict:
+    '''
+    Parse raw_html repeat times with backend, returns rows/s and the parsed data
+    '''
+    manager._row_parser = get_backend(backend)
+    result = manager._parse_search(raw_html)
+    start = perf_counter()
+    for _ in range(repeat):
+        manager._parse_search(raw_html)
+    elapsed = perf_counter() - start
+    rows = len(result) * repeat
+    return {'backend': backend, 'rows': rows, 'seconds': elapsed, 'rows_per_second': rows / elapsed if elapsed else 0, 'data': snapshot(result)}
+
+def bench_detail(manager: CrackmeManager, repeat: int) -> dict:
+    '''
+    Parse the recorded detail page repeat times, checks every field against DETAIL_EXPECTED
+    '''
+    with open(DETAIL_FIXTURE, 'r', encoding='utf-8') as f:
+        raw_html = f.read()
+    result = manager._parse_info(raw_html, DETAIL_URL)
+    start = perf_counter()
+    for _ in range(repeat):
+        manager._parse_info(raw_html, DETAIL_URL)
+    elapsed = perf_counter() - start
+    got = {x: getattr(result, x) for x in DETAIL_EXPECTED} if result is not None else {}
+    return {'pages': repeat, 'seconds': elapsed, 'pages_per_second': repeat / elapsed if elapsed else 0, 'identical': got == DETAIL_EXPECTED}
+
+def run_detail(repeat: int = 20) -> dict:
+    return bench_detail(CrackmeManager(None, ConfigManager('data/config.json')), repeat)
+
+def run(repeat: int = 20, scale: int = 10) -> list:
+    '''
+    Benchmark every available backend, checks all of them parse the same data
+    '''
+    manager = CrackmeManager(None, ConfigManager('data/config.json'))
+    raw_html = load_fixture(scale)
+    results = [bench_backend(manager, x, raw_html, repeat) for x in BACKENDS if x != 'lxml' or HAS_LXML]
+    reference = next(x for x in results if x['backend'] == 'bs4')['data']
+    for x in results:
+        x['identical'] = x['data'] == reference
+        del x['data']
+    return results
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='search page parser benchmark')
+    parser.add_argument('--repeat', type=int, default=20, help='parses per backend')
+    parser.add_argument('--scale', type=int, default=10, help='repeat the fixture rows N times')
+    args = parser.parse_args()
+
+    for x in run(args.repeat, args.scale):
+        print(f'{x['backend']:<10} {x['rows_per_second']:>12.0f} rows/s  {x['seconds']:.3f}s  {'identical' if x['identical'] else 'MISMATCH'}')
+    detail = run_detail(args.repeat)
+    print(f'{'detail':<10} {detail['pages_per_second']:>12.0f} pages/s {detail['seconds']:.3f}s  {'identical' if detail['identical'] else 'MISMATCH'}')
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+'''
+Table rendering speed\n
+python -m bench.render [--rows N]
+'''
+# Imports
+from io import StringIO
+from argparse import ArgumentParser
+from time import perf_counter
+
+from data.config import ConfigManager
+from data.crackme import CrackmeManager, ResultSet, rating_color
+from data.table import TableRenderer, add_centered_text
+from bench.parse import load_fixture
+
+# Constants
+WIDTH = 160
+
+
+# Functions
+def legacy_row(crackme_id: int, user: str, name: str, difficulty: float, quality: float, downloads: int, filehash: str, longest_user: int, longest_name: int) -> str:
+    '''
+    Row as Helper.crackme_display built it, one call per row
+    '''
+    space = lambda size: ' ' * size
+    if not crackme_id or crackme_id % 2 == 0:
+        color = '\033[0m'
+    else:
+        color = '\033[48;2;139;8;8m' if (crackme_id // 2) % 2 == 0 else '\033[48;2;64;0;64m'
+    dif_calc, qul_calc = int((difficulty / 6) * 16), int((quality / 6) * 16)
+    dif, qul = add_centered_text('#' * dif_calc + ' ' * (16 - dif_calc), str(difficulty)), add_centered_text('#' * qul_calc + ' ' * (16 - qul_calc), str(quality))
+    dif_color = rating_color(int(difficulty))
+    qul_color = rating_color(int(quality), True)
+    return color + f'#{crackme_id}{space(3 - len(str(crackme_id)))} {user}{space(longest_user+1 - len(user))}-> {name}{space(longest_name - len(name))} [{dif_color}{''.join(dif)}\033[0m] [{qul_color}{''.join(qul)}\033[0m]{color} {downloads}{space(14 - len(str(downloads)))}{filehash}'.ljust(WIDTH) + '\033[0m'
+
+def legacy_header(found) -> str:
+    '''
+    Header as main printed it above the rows
+    '''
+    space = lambda size: ' ' * size
+    return f'{space(5 - len(str(0)))} Username{space(found.longest_user + 3 - len('Username'))} Name{space(found.longest_name + 1 - len('Name'))} Difficulty{space(12)}Quality{space(14)}Downloads{space(5)}Hash'.ljust(WIDTH)
+
+def legacy_render(found, out) -> int:
+    print(legacy_header(found), file=out)
+    for i, x in enumerate(found):
+        print(legacy_row(i, x.user, x.name, x.difficulty, x.quality, x.downloads, x.filehash, found.longest_user, found.longest_name), file=out)
+    return len(found)
+
+def make_results(rows: int) -> ResultSet:
+    manager = CrackmeManager(None, ConfigManager('data/config.json'))
+    found = ResultSet()
+    while len(found) < rows:
+        found.extend(manager._parse_search(load_fixture()))
+    return ResultSet(found.records[:rows])
+
+def timed(render, rows: int) -> float:
+    start = perf_counter()
+    render()
+    elapsed = perf_counter() - start
+    return rows / elapsed if elapsed else 0
+
+def run(rows: int = 5000) -> dict:
+    '''
+    rows/s for the old per row print, the renderer and the renderer without colors
+    '''
+    found = make_results(rows)
+    renderer = TableRenderer(WIDTH, height=50)
+    legacy_out, table_out = StringIO(), StringIO()
+    legacy_render(found, legacy_out)
+    renderer.render(found, table_out)
+    identical = legacy_out.getvalue().splitlines() == table_out.getvalue().splitlines()
+    return {
+        'rows': rows,
+        'identical': identical,
+        'legacy_rows_per_second': timed(lambda: legacy_render(found, StringIO()), rows),
+        'table_rows_per_second': timed(lambda: TableRenderer(WIDTH, height=50).render(found, StringIO()), rows),
+        'plain_rows_per_second': timed(lambda: TableRenderer(WIDTH, color=False, height=50).render(found, StringIO()), rows)
+    }
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='table rendering benchmark')
+    parser.add_argument('--rows', type=int, default=5000, help='number of rows')
+    args = parser.parse_args()
+
+    result = run(args.rows)
+    print(f'legacy    {result['legacy_rows_per_second']:>10.0f} rows/s')
+    print(f'table     {result['table_rows_per_second']:>10.0f} rows/s  {'identical' if result['identical'] else 'MISMATCH'}')
+    print(f'plain     {result['plain_rows_per_second']:>10.0f} rows/s')
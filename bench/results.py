@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+'''
+Memory used by result sets\n
+python -m bench.results [--rows N]
+'''
+# Imports
+import tracemalloc
+from argparse import ArgumentParser
+
+from data.config import ConfigManager
+from data.crackme import CrackmeManager, Crackme, ResultSet
+from bench.parse import load_fixture
+
+
+# Classes
+class DictCrackme():
+    '''
+    Crackme as it was before __slots__, every field a raw string in a per instance __dict__
+    '''
+
+    def __init__(self, info: dict, crackme_manager):
+        for key, value in info.items():
+            setattr(self, key, value)
+        self.manager = crackme_manager
+
+
+# Functions
+def fresh(text: str) -> str:
+    '''
+    Copy of text as a new object, like every parsed page creates
+    '''
+    return (text + '.')[:-1]
+
+def raw_rows(parsed: list, rows: int) -> list:
+    '''
+    rows info dicts built from the recorded search page, every field a raw string as the site sends it
+    '''
+    infos = []
+    for i in range(rows):
+        row = parsed[i % len(parsed)]
+        tds = [fresh(x) for x in row['cells']]
+        infos.append({
+            'name': f'{tds[0]} {i}', 'url': f'https://crackmes.one{row['href']}{i}',
+            'download_url': f'https://crackmes.one/static/crackme/{i:024x}.zip', 'filename': f'{i:024x}.zip',
+            'filehash': f'{i:024x}', 'user': fresh(row['user']), 'user_url': fresh(row['user_url']),
+            'language': tds[2], 'arch': tds[3], 'difficulty': tds[4], 'quality': tds[5],
+            'os': tds[6], 'size': tds[7], 'date': tds[8], 'downloads': tds[9].split()[-1],
+            'solutions': tds[10], 'comments': tds[11]
+        })
+    return infos
+
+def measure(build) -> int:
+    '''
+    Bytes still allocated after build() returned
+    '''
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return after - before
+
+def run(rows: int = 10000) -> dict:
+    '''
+    Memory kept by rows crackmes, parsing the raw strings included
+    '''
+    manager = CrackmeManager(None, ConfigManager('data/config.json'))
+    manager._parse_search(load_fixture())
+    parsed = manager._row_parser(load_fixture())
+    legacy = measure(lambda: {'found': [DictCrackme(x, manager) for x in raw_rows(parsed, rows)]})
+    compact = measure(lambda: ResultSet(Crackme(x, manager) for x in raw_rows(parsed, rows)))
+    return {'rows': rows, 'legacy_bytes': legacy, 'resultset_bytes': compact}
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='result set memory benchmark')
+    parser.add_argument('--rows', type=int, default=10000, help='number of crackmes')
+    args = parser.parse_args()
+
+    result = run(args.rows)
+    per_10k = 10000 / result['rows']
+    print(f'dict based list  {result['legacy_bytes'] * per_10k / 1024 / 1024:8.2f} MB per 10k rows')
+    print(f'ResultSet        {result['resultset_bytes'] * per_10k / 1024 / 1024:8.2f} MB per 10k rows')
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+'''
+Offline benchmark suite against the local stub server\n
+python -m bench.run [--quick] [--output FILE] [--compare OLD.json]\n
+Measures parser rows/s, search latency, `latest all` crawl time, `download all`
+throughput and extract_zip time, and saves them as JSON next to the commit they ran on
+'''
+# Imports
+import os
+import atexit
+import tempfile
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from json import loads as json_loads, dump as json_dump
+from platform import python_version
+from statistics import median, quantiles
+from subprocess import run as subprocess_run
+from time import perf_counter
+
+from data.crackme import ResultSet
+from data.crawler import LatestCrawler
+from data.downloader import DownloadPool
+from bench import parse
+from bench.stub_server import StubServer, ARCHIVE_KINDS, PASSWORD, write_config
+
+# Constants
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, 'bench', 'results')
+SETTINGS = {
+    'full': {'parse_repeat': 20, 'parse_scale': 10, 'searches': 50, 'pages': 40, 'window': 8, 'downloads': 200, 'archive_size': 256 * 1024, 'extracts': 20},
+    'quick': {'parse_repeat': 3, 'parse_scale': 2, 'searches': 10, 'pages': 8, 'window': 8, 'downloads': 30, 'archive_size': 64 * 1024, 'extracts': 3}
+}
+# Nothing between the client and the stub but the code under test
+OVERRIDES = {'scheduler': {'rate': None, 'burst': 16, 'bandwidth': None}, 'http_cache_max_age': 0}
+
+
+# Functions
+def git_commit() -> str:
+    proc = subprocess_run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True)
+    return proc.stdout.strip() if proc.returncode == 0 else 'unknown'
+
+def timed(func, *args, **kwargs) -> tuple:
+    start = perf_counter()
+    result = func(*args, **kwargs)
+    return perf_counter() - start, result
+
+def bench_parse(settings: dict) -> dict:
+    return {x.pop('backend'): x for x in parse.run(settings['parse_repeat'], settings['parse_scale'])}
+
+def bench_search(main, settings: dict) -> dict:
+    '''
+    Latency of full searches (csrf token + post + parse + catalog)
+    '''
+    times = [timed(main.crackmes.search, f'bench {i}')[0] * 1000 for i in range(settings['searches'])]
+    cuts = quantiles(times, n=20) if len(times) > 1 else times * 19
+    return {'searches': len(times), 'median_ms': median(times), 'p95_ms': cuts[18], 'max_ms': max(times)}
+
+def bench_crawl(main, settings: dict) -> dict:
+    '''
+    `latest all` over the stub pages
+    '''
+    crawler = LatestCrawler(main.crackmes, window=settings['window'])
+    seconds, found = timed(crawler.crawl, 1)
+    return {'pages': settings['pages'], 'rows': len(found), 'seconds': seconds, 'pages_per_second': settings['pages'] / seconds, 'found': found}
+
+def bench_download(main, found, folder: str, settings: dict) -> dict:
+    '''
+    `download all` of the first crawled crackmes, without extraction
+    '''
+    subset = ResultSet(found.records[:settings['downloads']])
+    pool = DownloadPool(main.crackmes, workers=main.config.get('download_workers', 8), per_host=main.config.get('download_per_host', 4))
+    seconds, results = timed(pool.run, subset, os.path.join(folder, 'downloads'), False)
+    size = sum(x.size for x in results)
+    return {'crackmes': len(subset), 'ok': sum(1 for x in results if x.status), 'bytes': size, 'seconds': seconds, 'bytes_per_second': size / seconds}
+
+def bench_extract(main, server: StubServer, folder: str, settings: dict) -> dict:
+    '''
+    extract_zip on every archive kind, average seconds per archive
+    '''
+    results = {}
+    for kind in ARCHIVE_KINDS:
+        archive = os.path.join(folder, f'{kind}.zip')
+        with open(archive, 'wb') as f:
+            f.write(server.archives[kind])
+        times = []
+        for i in range(settings['extracts']):
+            seconds, status = timed(main.crackmes.extract_zip, archive, os.path.join(folder, 'extract', kind, str(i)), [PASSWORD], True)
+            if not status:
+                raise RuntimeError(f'extracting the {kind} archive failed')
+            times.append(seconds)
+        results[kind] = {'archives': len(times), 'seconds': sum(times) / len(times), 'bytes': len(server.archives[kind])}
+    return results
+
+def run(quick: bool = False) -> dict:
+    '''
+    Run every benchmark, returns the results with the commit and settings they ran with
+    '''
+    settings = SETTINGS['quick' if quick else 'full']
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': python_version(),
+        'settings': settings,
+        'results': {'parse': bench_parse(settings), 'parse_detail': parse.run_detail(settings['parse_repeat'])}
+    }
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as folder, StubServer(pages=settings['pages'], archive_size=settings['archive_size']) as server:
+        os.environ['COCLI_CONFIG'] = write_config(folder, server.base, OVERRIDES)
+        # main reads COCLI_CONFIG when it is imported
+        import main
+        # Downloads and extraction land below folder, progress output is dropped
+        os.chdir(folder)
+        try:
+            with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                report['results']['search'] = bench_search(main, settings)
+                crawl = bench_crawl(main, settings)
+                report['results']['download'] = bench_download(main, crawl.pop('found'), folder, settings)
+                report['results']['crawl'] = crawl
+                report['results']['extract'] = bench_extract(main, server, folder, settings)
+        finally:
+            os.chdir(cwd)
+        report['results']['requests'] = server.requests
+        # The cache folder is gone by the time main would save its index
+        atexit.unregister(main.http_cache.save_index)
+    return report
+
+def flatten(results: dict, prefix: str = '') -> dict:
+    '''
+    {'a': {'b': 1}} -> {'a.b': 1}, numbers only
+    '''
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f'{prefix}{key}.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[prefix + key] = value
+    return flat
+
+def compare(old: dict, new: dict) -> list:
+    '''
+    Lines with the change of every number both reports have
+    '''
+    before, after = flatten(old['results']), flatten(new['results'])
+    lines = [f'{old['commit']} -> {new['commit']}']
+    for key in sorted(before.keys() & after.keys()):
+        change = (after[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+        lines.append(f'{key:<40} {before[key]:>14.2f} {after[key]:>14.2f} {change:>+8.1f}%')
+    return lines
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='offline benchmark suite')
+    parser.add_argument('--quick', action='store_true', help='small run to check the suite works')
+    parser.add_argument('--output', type=str, help='result file, default bench/results/<timestamp>-<commit>.json')
+    parser.add_argument('--compare', type=str, help='earlier result file to compare against')
+    args = parser.parse_args()
+
+    report = run(args.quick)
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f'{report['timestamp'].replace(':', '')}-{report['commit']}.json')
+    with open(output, 'w') as f:
+        json_dump(report, f, indent=4)
+
+    results = report['results']
+    for backend, x in results['parse'].items():
+        print(f'parse {backend:<10} {x['rows_per_second']:>12.0f} rows/s')
+    print(f'parse detail     {results['parse_detail']['pages_per_second']:>12.0f} pages/s  {'identical' if results['parse_detail']['identical'] else 'MISMATCH'}')
+    print(f'search           median {results['search']['median_ms']:.1f}ms  p95 {results['search']['p95_ms']:.1f}ms')
+    print(f'latest all       {results['crawl']['pages']} pages in {results['crawl']['seconds']:.2f}s ({results['crawl']['pages_per_second']:.1f} pages/s)')
+    print(f'download all     {results['download']['ok']}/{results['download']['crackmes']} in {results['download']['seconds']:.2f}s ({results['download']['bytes_per_second'] / 1024 / 1024:.1f} MB/s)')
+    for kind, x in results['extract'].items():
+        print(f'extract {kind:<10} {x['seconds'] * 1000:.1f}ms per archive')
+    print(f'Saved {output}')
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            print('\n'.join(compare(json_loads(f.read()), report)))
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+'''
+Startup cost of one-shot invocations\n
+python -m bench.startup [--repeat N] [--top N] [--target MS]\n
+Prints the -X importtime breakdown of main and the time from process start
+until the first request of `main.py -s name=bench` reaches a local server,
+exits with 1 if that is above the target
+'''
+# Imports
+import os
+import sys
+import tempfile
+from argparse import ArgumentParser
+from statistics import median
+from subprocess import run as subprocess_run, DEVNULL
+from time import perf_counter
+
+from bench.stub_server import StubServer, write_config
+
+# Constants
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TARGET_FIRST_REQUEST_MS = 300
+
+
+# Functions
+def import_times(top: int = 15) -> list:
+    '''
+    (cumulative ms, self ms, module) of the slowest imports below main
+    '''
+    proc = subprocess_run([sys.executable, '-X', 'importtime', '-c', 'import main'], cwd=ROOT, capture_output=True, text=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative_us) / 1000, int(self_us) / 1000, name.rstrip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+def time_command(argv: list, env: dict = None, server: StubServer = None) -> tuple:
+    '''
+    Run argv from the repo root -> (total ms, ms until the first request or None)
+    '''
+    if server:
+        server.reset()
+    start = perf_counter()
+    subprocess_run(argv, cwd=ROOT, env=env, stdout=DEVNULL, stderr=DEVNULL)
+    total = (perf_counter() - start) * 1000
+    if server is None or server.first_request is None:
+        return total, None
+    return total, (server.first_request - start) * 1000
+
+def run(repeat: int = 5) -> dict:
+    '''
+    Median wall times of the interpreter alone, importing main and a one-shot search
+    '''
+    with StubServer(pages=1) as server, tempfile.TemporaryDirectory() as folder:
+        env = dict(os.environ, COCLI_CONFIG=write_config(folder, server.base))
+        python = [sys.executable, '-c', 'pass']
+        imports = [sys.executable, '-c', 'import main']
+        search = [sys.executable, 'main.py', '-s', 'name=bench', '--no-color']
+        results = {
+            'python': median(time_command(python)[0] for _ in range(repeat)),
+            'import_main': median(time_command(imports)[0] for _ in range(repeat))
+        }
+        runs = [time_command(search, env, server) for _ in range(repeat)]
+    results['search_total'] = median(x[0] for x in runs)
+    first = [x[1] for x in runs if x[1] is not None]
+    results['first_request'] = median(first) if first else None
+    return results
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='startup benchmark')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per measurement, the median is reported')
+    parser.add_argument('--top', type=int, default=15, help='slowest imports to show')
+    parser.add_argument('--target', type=float, default=TARGET_FIRST_REQUEST_MS, help='time to first request target in ms')
+    args = parser.parse_args()
+
+    print(f'{'cumulative':>12} {'self':>9}  module')
+    for cumulative, own, name in import_times(args.top):
+        print(f'{cumulative:>10.1f}ms {own:>7.1f}ms  {name}')
+    print()
+
+    results = run(args.repeat)
+    print(f'python -c pass         {results['python']:>8.1f}ms')
+    print(f'import main            {results['import_main']:>8.1f}ms')
+    print(f'search, total          {results['search_total']:>8.1f}ms')
+    if results['first_request'] is None:
+        print('search never reached the server')
+        sys.exit(1)
+    ok = results['first_request'] <= args.target
+    print(f'time to first request  {results['first_request']:>8.1f}ms  (target {args.target:.0f}ms) {'[ OK ]' if ok else '[ FAILED ]'}')
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+'''
+Local stand-in for crackmes.one\n
+python -m bench.stub_server [--port N] [--pages N] [--archive-size BYTES]\n
+Serves the recorded search page, generated lasts/detail pages, login/logout
+and zip archives (plain, password protected and nested) with Range support
+'''
+# Imports
+import os
+from argparse import ArgumentParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from json import loads as json_loads, dump as json_dump
+from random import Random
+from threading import Thread
+from time import perf_counter
+
+from bench.parse import load_fixture
+from bench.zipcrypto import make_zip
+
+# Constants
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SITE = 'https://crackmes.one/'
+PASSWORD = 'crackmes.one'
+ARCHIVE_KINDS = ['plain', 'encrypted', 'nested']
+CSRF_FORM = '<form method="post"><input type="hidden" name="csrf_token" value="stub-token"></form>'
+LANGUAGES = ['C/C++', 'Assembler', 'Rust', '.NET', 'Delphi', 'Go']
+ARCHS = ['x86', 'x86-64', 'ARM', 'MIPS']
+PLATFORMS = ['Windows', 'Unix/linux etc.', 'macOS', 'Multiplatform']
+
+
+# Functions
+def filehash(index: int) -> str:
+    return f'{index * 0x9e3779b1:024x}'
+
+def archive_kind(file_hash: str) -> str:
+    '''
+    Kind of archive served for file_hash, spread evenly over ARCHIVE_KINDS
+    '''
+    try:
+        return ARCHIVE_KINDS[int(file_hash, 16) // 0x9e3779b1 % len(ARCHIVE_KINDS)]
+    except ValueError:
+        return ARCHIVE_KINDS[0]
+
+def listing_row(index: int) -> str:
+    '''
+    One result row in the layout of the recorded search page
+    '''
+    return f'''
+                <tr class="text-center">
+                    <td><a href="/crackme/{filehash(index)}">stub crackme {index}</a></td>
+                    <td><a href="/user/author_{index % 97}">author_{index % 97}</a></td>
+                    <td>{LANGUAGES[index % len(LANGUAGES)]}</td>
+                    <td>{ARCHS[index % len(ARCHS)]}</td>
+                    <td>{1 + index % 50 / 10:.1f}</td>
+                    <td>{1 + index % 47 / 10:.1f}</td>
+                    <td>{PLATFORMS[index % len(PLATFORMS)]}</td>
+                    <td>{index % 900 + 1}.00 KB</td>
+                    <td>1:00 PM 01/01/2020</td>
+                    <td>
+                        <i class="fas fa-download"></i> {index * 7 % 5000}
+                    </td>
+                    <td>{index % 5}</td>
+                    <td>{index % 11}</td>
+                </tr>'''
+
+def detail_page(index: int) -> str:
+    '''
+    Crackme page, one panel div per detail like the site
+    '''
+    details = [
+        ('Author', f'<a href="/user/author_{index % 97}">author_{index % 97}</a>'),
+        ('Language', LANGUAGES[index % len(LANGUAGES)]),
+        ('Upload', '1:00 PM 01/01/2020'),
+        ('Description', f'stub crackme {index}'),
+        ('Download', f'<a href="/static/crackme/{filehash(index)}.zip">{filehash(index)}.zip</a>'),
+        ('Platform', PLATFORMS[index % len(PLATFORMS)]),
+        ('Difficulty', f'{1 + index % 50 / 10:.1f}'),
+        ('Quality', f'{1 + index % 47 / 10:.1f}'),
+        ('Arch', ARCHS[index % len(ARCHS)]),
+        ('Downloads', str(index * 7 % 5000)),
+        ('Size', f'{index % 900 + 1}.00 KB'),
+        ('Solutions', str(index % 5)),
+        ('Comments', str(index % 11))
+    ]
+    panels = ''.join(f'\n            <div class="column col-3"><p>{label}<br>{value}</p></div>' for label, value in details)
+    return f'''<!DOCTYPE html>
+<html lang="en">
+<body>
+    <div class="container grid-lg wrapper">
+        <h3><a href="/user/author_{index % 97}">author_{index % 97}</a>'s stub crackme {index}</h3>
+        <div class="columns panel-background">{panels}
+        </div>
+    </div>
+</body>
+</html>'''
+
+def build_archives(size: int) -> dict:
+    '''
+    One archive per kind holding size bytes of incompressible data, like a packed binary
+    '''
+    data = Random(size).randbytes(size)
+    members = [('crackme.exe', data), ('readme.txt', b'stub crackme\n' * 8)]
+    password = PASSWORD.encode('utf-8')
+    return {
+        'plain': make_zip(members),
+        'encrypted': make_zip(members, password),
+        'nested': make_zip([('inner.zip', make_zip(members, password))], password)
+    }
+
+def write_config(folder: str, base: str, overrides: dict = None) -> str:
+    '''
+    Copy of data/config.json with every crackmes.one url pointing at base and all state kept in folder
+    '''
+    with open(os.path.join(ROOT, 'data', 'config.json'), 'r') as f:
+        config = json_loads(f.read())
+    for key, value in config.items():
+        if isinstance(value, str) and value.startswith(SITE):
+            config[key] = base + value[len(SITE):]
+        elif isinstance(value, dict):
+            config[key] = {k: base + v[len(SITE):] if isinstance(v, str) and v.startswith(SITE) else v for k, v in value.items()}
+    config['catalog_file'] = os.path.join(folder, 'catalog.db')
+    config['http_cache_dir'] = os.path.join(folder, 'cache')
+    config['object_store'] = os.path.join(folder, 'objects')
+    config.update(overrides or {})
+    path = os.path.join(folder, 'config.json')
+    with open(path, 'w') as f:
+        json_dump(config, f)
+    return path
+
+
+# Classes
+class StubServer(ThreadingHTTPServer):
+    '''
+    crackmes.one on 127.0.0.1, pages = number of non empty lasts pages\n
+    Counts requests and remembers when the first one came in
+    '''
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, pages: int = 20, per_page: int = 50, archive_size: int = 256 * 1024):
+        super().__init__(('127.0.0.1', port), StubHandler)
+        self.pages = pages
+        self.per_page = per_page
+        self.search_page = load_fixture().replace('<body>', '<body>' + CSRF_FORM, 1).encode('utf-8')
+        head, rest = load_fixture().split('<tbody>', 1)
+        self._page_head = (head.replace('<body>', '<body>' + CSRF_FORM, 1) + '<tbody>')
+        self._page_tail = '</tbody>' + rest.split('</tbody>', 1)[1]
+        self.archives = build_archives(archive_size)
+        self.requests = 0
+        self.first_request = None
+        self._thread = None
+
+    @property
+    def base(self) -> str:
+        return f'http://127.0.0.1:{self.server_port}/'
+
+    def lasts_page(self, page: int) -> bytes:
+        rows = ''
+        if 1 <= page <= self.pages:
+            start = (page - 1) * self.per_page
+            rows = ''.join(listing_row(x) for x in range(start, start + self.per_page))
+        return (self._page_head + rows + '\n                ' + self._page_tail).encode('utf-8')
+
+    def reset(self) -> None:
+        self.requests = 0
+        self.first_request = None
+
+    def start(self) -> 'StubServer':
+        self._thread = Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> 'StubServer':
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real site
+
+    def _send(self, body: bytes, status: int = 200, content_type: str = 'text/html; charset=utf-8', headers: dict = None) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def _send_archive(self, data: bytes) -> None:
+        '''
+        Whole archive or the requested byte range of it
+        '''
+        ranges = self.headers.get('Range', '')
+        if not ranges.startswith('bytes='):
+            return self._send(data, content_type='application/zip', headers={'Accept-Ranges': 'bytes'})
+        start = int(ranges[len('bytes='):].split('-', 1)[0] or 0)
+        if start >= len(data):
+            return self._send(b'', 416, headers={'Content-Range': f'bytes */{len(data)}'})
+        self._send(data[start:], 206, 'application/zip', {'Content-Range': f'bytes {start}-{len(data) - 1}/{len(data)}', 'Accept-Ranges': 'bytes'})
+
+    def _count(self) -> None:
+        server = self.server
+        if server.first_request is None:
+            server.first_request = perf_counter()
+        server.requests += 1
+
+    def do_GET(self) -> None:
+        self._count()
+        path = self.path.split('?', 1)[0]
+        parts = [x for x in path.split('/') if x]
+        if path in ('/', '/search'):
+            return self._send(self.server.search_page)
+        if len(parts) == 2 and parts[0] == 'lasts':
+            return self._send(self.server.lasts_page(int(parts[1]) if parts[1].isdigit() else 1))
+        if len(parts) == 2 and parts[0] == 'crackme':
+            try:
+                index = int(parts[1], 16) // 0x9e3779b1
+            except ValueError:
+                return self._send(b'not found', 404)
+            return self._send(detail_page(index).encode('utf-8'))
+        if len(parts) == 3 and parts[:2] == ['static', 'crackme'] and parts[2].endswith('.zip'):
+            return self._send_archive(self.server.archives[archive_kind(parts[2][:-len('.zip')])])
+        if path == '/login':
+            return self._send(CSRF_FORM.encode('utf-8'))
+        if path == '/logout':
+            return self._send(b'Goodbye!')
+        if path == '/upload/crackme':
+            return self._send(b'Please login')
+        self._send(b'not found', 404)
+
+    do_HEAD = do_GET
+
+    def do_POST(self) -> None:
+        self._count()
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        path = self.path.split('?', 1)[0]
+        if path == '/search':
+            return self._send(self.server.search_page)
+        if path == '/login':
+            return self._send(b'Login successful!', headers={'Set-Cookie': 'crackmesone=stub; Path=/'})
+        self._send(b'not found', 404)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='local crackmes.one stub')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--pages', type=int, default=20, help='non empty lasts pages')
+    parser.add_argument('--archive-size', type=int, default=256 * 1024, help='bytes of data in every archive')
+    args = parser.parse_args()
+
+    server = StubServer(args.port, args.pages, archive_size=args.archive_size)
+    print(f'Serving on {server.base} (COCLI_CONFIG from bench.stub_server.write_config points at it)')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,75 @@
+'''
+Minimal zip writer with traditional PKWARE (ZipCrypto) encryption\n
+zipfile can read these archives but not write them, the benchmarks need
+password protected crackmes like the ones crackmes.one serves
+'''
+# Imports
+import os
+import zlib
+from struct import pack
+
+
+# Functions
+def _crc_table() -> list:
+    table = []
+    for i in range(256):
+        c = i
+        for _ in range(8):
+            c = (c >> 1) ^ 0xEDB88320 if c & 1 else c >> 1
+        table.append(c)
+    return table
+
+CRC_TABLE = _crc_table()
+
+def make_zip(members: list, password: bytes = None) -> bytes:
+    '''
+    Deflated zip of members [(name, data)], every member encrypted with password if given
+    '''
+    local = bytearray()
+    central = bytearray()
+    for name, data in members:
+        crc = zlib.crc32(data)
+        compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+        payload = compressor.compress(data) + compressor.flush()
+        flags = 0
+        if password:
+            flags = 0x1
+            cipher = ZipCrypto(password)
+            # 11 random bytes and the check byte, the high byte of the crc
+            payload = cipher.encrypt(os.urandom(11) + bytes([(crc >> 24) & 0xff])) + cipher.encrypt(payload)
+        encoded = name.encode('utf-8')
+        offset = len(local)
+        local += pack('<IHHHHHIIIHH', 0x04034b50, 20, flags, 8, 0, 0x21, crc, len(payload), len(data), len(encoded), 0) + encoded + payload
+        central += pack('<IHHHHHHIIIHHHHHII', 0x02014b50, 20, 20, flags, 8, 0, 0x21, crc, len(payload), len(data), len(encoded), 0, 0, 0, 0, 0, offset) + encoded
+    end = pack('<IHHHHIIH', 0x06054b50, 0, 0, len(members), len(members), len(central), len(local), 0)
+    return bytes(local + central + end)
+
+
+# Classes
+class ZipCrypto():
+    '''
+    The three key stream cipher of APPNOTE 6.1
+    '''
+
+    def __init__(self, password: bytes):
+        self.keys = [0x12345678, 0x23456789, 0x34567890]
+        for x in password:
+            self._update(x)
+
+    def _crc(self, crc: int, byte: int) -> int:
+        return (crc >> 8) ^ CRC_TABLE[(crc ^ byte) & 0xff]
+
+    def _update(self, byte: int) -> None:
+        keys = self.keys
+        keys[0] = self._crc(keys[0], byte)
+        keys[1] = (keys[1] + (keys[0] & 0xff)) & 0xffffffff
+        keys[1] = (keys[1] * 134775813 + 1) & 0xffffffff
+        keys[2] = self._crc(keys[2], (keys[1] >> 24) & 0xff)
+
+    def encrypt(self, data: bytes) -> bytes:
+        out = bytearray()
+        for x in data:
+            temp = (self.keys[2] | 2) & 0xffff
+            out.append(x ^ (((temp * (temp ^ 1)) >> 8) & 0xff))
+            self._update(x)
+        return bytes(out)
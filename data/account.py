@@ -1,3 +1,7 @@
+# Imports
+from data.stats import instrument
+
+
 class Acc():
 
     def __init__(self, crackmes = None, requests_session = None, config_manager = None):
@@ -7,6 +11,7 @@ class Acc():
         self.logged_in = False
         self.username = None
     
+    @instrument('account')
     def login(self, use_cookie: bool, username: str, password: str, save_cookie: bool) -> int:
         '''
         Login -> username + password -> 0 Something went Wrong, 1 Ok
@@ -16,13 +21,11 @@ class Acc():
             self.requests_session.cookies.update({'crackmesone': self.config.get('crackmesone')})
             req = self.requests_session.get(self.config.get('host'))
 
-        csrf_token = self.crackmes.get_csrf_token(self.config.get('login'))
         payload = {
             'name': username,
-            'password': password,
-            'csrf_token': csrf_token
+            'password': password
         }
-        req = self.requests_session.post(self.config.get('login'), data=payload, headers=self.requests_session.headers.update(self.config.get('login_headers')))
+        req = self.crackmes.post_form(self.config.get('login'), self.config.get('login'), payload, headers=self.requests_session.headers.update(self.config.get('login_headers')))
         status = 0
         if 'Password is incorrect' in req.text and self.check_login():
             print('Username or Password is wrong')
@@ -34,6 +37,7 @@ class Acc():
             self.config.update('crackmesone', req.cookies['crackmesone'])
         return status
     
+    @instrument('account')
     def logout(self) -> int:
         '''
         Logout -> 1 logged out, 0 something went wrong
@@ -46,6 +50,7 @@ class Acc():
         print('[ Something went wrong ]')
         return 0
     
+    @instrument('account')
     def check_login(self) -> int:
         '''
         Check if you're really logged in
@@ -55,6 +60,7 @@ class Acc():
             return 1
         return 0
 
+    @instrument('account')
     def get_username(self) -> str:
         '''
         Get your username
@@ -62,4 +68,4 @@ class Acc():
         if not self.logged_in:
             print('[ Please login first ]')
             return ''
-        req = requests.get(self.config['host'])
\ No newline at end of file
+        req = self.requests_session.get(self.config.get('host'))
\ No newline at end of file
@@ -0,0 +1,177 @@
+# Imports
+import os
+from json import loads as json_loads, dump as json_dump
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from zipfile import ZipFile
+
+# zipfile, tempfile and the process pool are imported where they are used,
+# most invocations never extract anything
+
+
+# Functions
+def encrypted_members(zf: 'ZipFile') -> list:
+    '''
+    Members of zf that need a password
+    '''
+    return [x for x in zf.infolist() if x.flag_bits & 0x1 and not x.is_dir()]
+
+def check_password(zf: 'ZipFile', member, password: str) -> bool:
+    '''
+    Check password against a single member\n
+    Opening verifies the check byte of the encryption header,
+    reading the member to the end verifies its CRC (the check byte has a 1/256 false positive rate)
+    '''
+    import zlib
+    from zipfile import BadZipFile
+    try:
+        with zf.open(member, pwd=bytes(password, 'utf-8')) as f:
+            while f.read(1024 * 64):
+                pass
+    except (RuntimeError, BadZipFile, zlib.error, EOFError):
+        return False
+    return True
+
+def probe_password(zf: 'ZipFile', passwords: list) -> str:
+    '''
+    Find the password of zf without extracting anything\n
+    Returns '' if zf is not encrypted, None if no password matches
+    '''
+    members = encrypted_members(zf)
+    if not members:
+        return ''
+    smallest = min(members, key=lambda x: x.compress_size)
+    for password in passwords:
+        if check_password(zf, smallest, password):
+            return password
+    return None
+
+def stamp_path(file: str) -> str:
+    return file + '.extracted'
+
+def is_extracted(file: str) -> bool:
+    '''
+    Check if file was extracted after it was last modified
+    '''
+    stamp = stamp_path(file)
+    return os.path.isfile(stamp) and os.path.getmtime(stamp) >= os.path.getmtime(file)
+
+def is_complete_zip(file: str) -> bool:
+    '''
+    Check that file is a whole zip, the central directory is there and every member fits in the file\n
+    A download that was cut short loses the central directory at the end
+    '''
+    from zipfile import ZipFile, BadZipFile
+    try:
+        size = os.path.getsize(file)
+        with ZipFile(file) as zf:
+            return all(x.header_offset + x.compress_size <= size for x in zf.infolist())
+    except (BadZipFile, OSError):
+        return False
+
+def write_stamp(file: str, password: str, nested: list) -> int:
+    '''
+    Mark file as extracted, nested = archives that came out of it
+    '''
+    with open(stamp_path(file), 'w') as f:
+        json_dump({'password': password, 'nested': nested}, f)
+    return 1
+
+def extract_archive(file: str, output_folder: str, passwords: list, source = None, memory_limit: int = 64 * 1024 * 1024) -> dict:
+    '''
+    Extract file and every single nested zip inside it, never prints\n
+    source = file like object holding the archive, file is then only used for the extracted stamp\n
+    Nested archives are kept in memory up to memory_limit and spill to a temp file above it,
+    they are never written to output_folder\n
+    Returns {'file', 'status', 'passwords' (one per level), 'nested', 'error', 'seconds'}
+    '''
+    from zipfile import ZipFile, is_zipfile
+    from tempfile import SpooledTemporaryFile
+    from shutil import copyfileobj
+    result = {'file': file, 'status': 0, 'passwords': [], 'nested': [], 'error': '', 'seconds': 0.0}
+    start = perf_counter()
+    current = source if source is not None else file
+    label = file
+    try:
+        while True:
+            nested = None
+            with ZipFile(current) as zf:
+                pw = probe_password(zf, passwords)
+                if pw is None:
+                    result['error'] = f'no password matches {label}'
+                    break
+                pwd = bytes(pw, 'utf-8') if pw else None
+                names = zf.namelist()
+                if len(names) == 1 and names[0].lower().endswith('.zip'):
+                    nested = SpooledTemporaryFile(max_size=memory_limit)
+                    with zf.open(names[0], pwd=pwd) as member:
+                        copyfileobj(member, nested, 1024 * 1024)
+                    nested.seek(0)
+                else:
+                    zf.extractall(path=output_folder, pwd=pwd)
+            result['passwords'].append(pw)
+            if current is not source and current is not file:
+                current.close()
+            if nested is None:
+                result['status'] = 1
+                break
+            if not is_zipfile(nested):
+                # Named .zip but it is not one, keep it as a plain file
+                nested.seek(0)
+                with open(os.path.join(output_folder, os.path.basename(names[0])), 'wb') as f:
+                    copyfileobj(nested, f, 1024 * 1024)
+                nested.close()
+                result['status'] = 1
+                break
+            current = nested
+            label = f'{label} -> {names[0]}'
+            result['nested'].append(names[0])
+    except Exception as e:
+        result['error'] = f'{label}: {e}'
+    if result['status']:
+        write_stamp(file, result['passwords'][0], result['nested'])
+    result['seconds'] = perf_counter() - start
+    return result
+
+def find_archives(folder: str, force: bool = False) -> list:
+    '''
+    All zip files below folder that still need extracting\n
+    Skips the object store, unfinished downloads and archives that came out of another archive
+    '''
+    archives = []
+    for root, dirs, files in os.walk(folder):
+        dirs[:] = [x for x in dirs if not x.startswith('.')]
+        nested = set()
+        for x in files:
+            if x.endswith('.zip.extracted'):
+                try:
+                    with open(os.path.join(root, x), 'r') as f:
+                        nested.update(json_loads(f.read()).get('nested', []))
+                except (OSError, ValueError):
+                    pass
+        for x in files:
+            if not x.lower().endswith('.zip') or x in nested:
+                continue
+            path = os.path.join(root, x)
+            if force or not is_extracted(path):
+                archives.append(path)
+    return archives
+
+def bulk_extract(archives: list, passwords: list, workers: int = None) -> list:
+    '''
+    Extract every archive into its own folder across a process pool, results in input order
+    '''
+    from concurrent.futures import ProcessPoolExecutor
+    workers = workers or os.cpu_count() or 1
+    if not archives:
+        return []
+    with ProcessPoolExecutor(max_workers=min(workers, len(archives))) as pool:
+        return list(pool.map(
+            extract_archive,
+            archives,
+            [os.path.dirname(x) or '.' for x in archives],
+            [passwords] * len(archives),
+            chunksize=max(1, len(archives) // (workers * 4))
+        ))
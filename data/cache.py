@@ -0,0 +1,287 @@
+# Imports
+import os
+import zlib
+from collections import OrderedDict
+from json import loads as json_loads, dump as json_dump
+from hashlib import sha256
+from threading import Lock
+from time import time
+
+from requests.adapters import HTTPAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from data.stats import collector
+
+# Constants
+# Headers that describe the wire format, the cached body is already decoded
+SKIP_HEADERS = ['content-encoding', 'content-length', 'transfer-encoding', 'set-cookie']
+
+
+# Classes
+class ResponseCache():
+    '''
+    Compressed on disk store for response bodies\n
+    Entries are evicted least recently used first once max_bytes is exceeded.
+    The index is kept in use order and written every save_every stores and at exit
+    '''
+
+    def __init__(self, cache_dir: str = 'cache', max_bytes: int = 50 * 1024 * 1024, max_age: float = 300, save_every: int = 100):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.save_every = max(1, int(save_every))
+        self.index_file = os.path.join(cache_dir, 'index.json')
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.bytes_saved = 0
+        self._lock = Lock()
+        self._unsaved = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index = self.load_index()
+        self._disk_bytes = sum(x['disk_size'] for x in self.index.values())
+
+    def load_index(self) -> dict:
+        '''
+        Load the index of cached entries least recently used first, drop entries whose body is gone\n
+        Bodies missing from the index (stored after the last save of a process that
+        did not exit cleanly) are removed, they would never be evicted
+        '''
+        index = {}
+        if os.path.isfile(self.index_file):
+            try:
+                with open(self.index_file, 'r') as f:
+                    index = json_loads(f.read())
+            except ValueError:
+                index = {}
+        bodies = {x[:-len('.z')] for x in os.listdir(self.cache_dir) if x.endswith('.z')}
+        for key in bodies - index.keys():
+            os.remove(self._path(key))
+        return OrderedDict(sorted(((k, v) for k, v in index.items() if k in bodies), key=lambda x: x[1]['accessed']))
+
+    def save_index(self) -> int:
+        '''
+        Write the index to disk, the lock is only held while copying it
+        '''
+        with self._lock:
+            index = {k: dict(v) for k, v in self.index.items()}
+            self._unsaved = 0
+        tmp = self.index_file + '.tmp'
+        with open(tmp, 'w') as f:
+            json_dump(index, f)
+        os.replace(tmp, self.index_file)
+        return 1
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + '.z')
+
+    def key(self, request) -> str:
+        '''
+        Cache key of a prepared request, cookies are part of the key
+        '''
+        return sha256(f'{request.url}\n{request.headers.get('Cookie', '')}'.encode()).hexdigest()
+
+    def count(self, name: str, amount: int = 1) -> int:
+        '''
+        Add amount to the counter name (hits, misses, revalidated, bytes_saved)
+        '''
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+        return 1
+
+    def size(self) -> int:
+        return sum(x['size'] for x in self.index.values())
+
+    def get(self, key: str) -> dict:
+        '''
+        Get the index entry of key, None if not cached
+        '''
+        with self._lock:
+            entry = self.index.get(key)
+            if entry:
+                entry['accessed'] = time()
+                self.index.move_to_end(key)
+            return entry
+
+    def is_fresh(self, entry: dict) -> bool:
+        return time() - entry['stored_at'] <= self.max_age
+
+    def read(self, key: str) -> bytes:
+        '''
+        Read and decompress the body of key
+        '''
+        with open(self._path(key), 'rb') as f:
+            return zlib.decompress(f.read())
+
+    def store(self, key: str, response) -> int:
+        '''
+        Store response under key
+        '''
+        body = response.content
+        compressed = zlib.compress(body, 6)
+        with open(self._path(key), 'wb') as f:
+            f.write(compressed)
+        with self._lock:
+            old = self.index.pop(key, None)
+            if old:
+                self._disk_bytes -= old['disk_size']
+            self._disk_bytes += len(compressed)
+            self._unsaved += 1
+            save = self._unsaved >= self.save_every
+            self.index[key] = {
+                'url': response.url,
+                'status': response.status_code,
+                'headers': {k: v for k, v in response.headers.items() if k.lower() not in SKIP_HEADERS},
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'size': len(body),
+                'disk_size': len(compressed),
+                'stored_at': time(),
+                'accessed': time()
+            }
+        self.evict()
+        if save:
+            self.save_index()
+        return 1
+
+    def refresh(self, key: str) -> int:
+        '''
+        Mark key as just validated by the server
+        '''
+        with self._lock:
+            if key in self.index:
+                self.index[key]['stored_at'] = time()
+        return 1
+
+    def evict(self) -> int:
+        '''
+        Drop least recently used entries until the cache fits max_bytes, returns how many were dropped
+        '''
+        dropped = 0
+        with self._lock:
+            while self._disk_bytes > self.max_bytes and self.index:
+                key, entry = self.index.popitem(last=False)
+                self._disk_bytes -= entry['disk_size']
+                if os.path.isfile(self._path(key)):
+                    os.remove(self._path(key))
+                dropped += 1
+        return dropped
+
+    def clear(self) -> int:
+        '''
+        Remove every cached entry
+        '''
+        with self._lock:
+            for key in self.index:
+                if os.path.isfile(self._path(key)):
+                    os.remove(self._path(key))
+            self.index = OrderedDict()
+            self._disk_bytes = 0
+        self.save_index()
+        return 1
+
+    def stats(self) -> dict:
+        return {
+            'entries': len(self.index),
+            'bytes': self.size(),
+            'disk_bytes': self._disk_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidated': self.revalidated,
+            'bytes_saved': self.bytes_saved
+        }
+
+
+class CacheAdapter(HTTPAdapter):
+    '''
+    Transport adapter answering GET requests from a ResponseCache\n
+    Only urls starting with one of prefixes are cached, streamed requests and
+    requests with Cache-Control: no-cache always go to the server
+
+    timeout = (connect, read) used for requests that don't set their own,
+    scheduler = RequestScheduler every request that misses the cache waits for,
+    other kwargs (pool sizes, max_retries) go to HTTPAdapter
+    '''
+
+    def __init__(self, cache: ResponseCache, prefixes: list = None, timeout: tuple = None, scheduler = None, **kwargs):
+        self.cache = cache
+        self.prefixes = tuple(x for x in (prefixes or []) if x)
+        self.timeout = timeout
+        self.scheduler = scheduler
+        super().__init__(**kwargs)
+
+    def _cacheable(self, request, stream: bool) -> bool:
+        return (
+            request.method == 'GET'
+            and not stream
+            and request.url.startswith(self.prefixes)
+            and 'no-cache' not in request.headers.get('Cache-Control', '')
+        )
+
+    def _build_cached(self, request, key: str, entry: dict) -> Response:
+        '''
+        Build a response for request from the cached entry
+        '''
+        response = Response()
+        response.status_code = entry['status']
+        response.reason = 'OK'
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = self.cache.read(key)
+        response._content_consumed = True
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.from_cache = True
+        return response
+
+    def _send(self, request, stream: bool, **kwargs) -> Response:
+        '''
+        Send request over the network, after the scheduler let it through
+
+        Streamed bodies are accounted by whoever reads them
+        '''
+        if self.scheduler is None:
+            return super().send(request, stream=stream, **kwargs)
+        # Part of the network time requests reports, recorded on its own as well
+        collector.add('queue', self.scheduler.acquire())
+        response = super().send(request, stream=stream, **kwargs)
+        if not stream:
+            self.scheduler.throttle(len(response.content))
+        return response
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        if timeout is None:
+            timeout = self.timeout
+        if not self._cacheable(request, stream):
+            return self._send(request, stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+
+        key = self.cache.key(request)
+        entry = self.cache.get(key)
+        if entry and self.cache.is_fresh(entry):
+            self.cache.count('hits')
+            self.cache.count('bytes_saved', entry['size'])
+            return self._build_cached(request, key, entry)
+
+        if entry:
+            if entry['etag']:
+                request.headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                request.headers['If-Modified-Since'] = entry['last_modified']
+
+        response = self._send(request, stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+        if entry and response.status_code == 304:
+            self.cache.count('hits')
+            self.cache.count('revalidated')
+            self.cache.count('bytes_saved', entry['size'])
+            self.cache.refresh(key)
+            return self._build_cached(request, key, entry)
+
+        self.cache.count('misses')
+        cache_control = response.headers.get('Cache-Control', '')
+        if response.status_code == 200 and 'Set-Cookie' not in response.headers and 'no-store' not in cache_control:
+            self.cache.store(key, response)
+        return response
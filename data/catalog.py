@@ -0,0 +1,158 @@
+# Imports
+import sqlite3
+from threading import Lock
+from time import time
+from json import dumps as json_dumps
+
+# Constants
+FIELDS = [
+    'filehash', 'name', 'url', 'download_url', 'filename', 'user', 'user_url',
+    'language', 'arch', 'os', 'difficulty', 'quality', 'size', 'date',
+    'downloads', 'solutions', 'comments'
+]
+INDEXED = ['name', 'user', 'language', 'arch', 'os', 'difficulty', 'quality']
+
+SCHEMA = f'''
+CREATE TABLE IF NOT EXISTS crackmes (
+    filehash TEXT PRIMARY KEY,
+    name TEXT, url TEXT, download_url TEXT, filename TEXT,
+    user TEXT COLLATE NOCASE, user_url TEXT,
+    language TEXT COLLATE NOCASE, arch TEXT COLLATE NOCASE, os TEXT COLLATE NOCASE,
+    difficulty REAL, quality REAL,
+    size INTEGER, date TEXT, downloads INTEGER, solutions INTEGER, comments INTEGER,
+    seen_at REAL
+);
+CREATE TABLE IF NOT EXISTS queries (
+    key TEXT PRIMARY KEY,
+    fetched_at REAL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+{''.join(f'CREATE INDEX IF NOT EXISTS idx_crackmes_{x} ON crackmes ({x});' for x in INDEXED)}
+'''
+
+
+# Classes
+class Catalog():
+    '''
+    Local SQLite store of every parsed crackme, keyed by filehash
+    '''
+
+    def __init__(self, db_file: str = 'data/catalog.db'):
+        self.db_file = db_file
+        self._lock = Lock()
+        self.db = sqlite3.connect(db_file, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self) -> int:
+        '''
+        Catalogs from before sizes were byte counts have a TEXT size column,
+        rebuild the table with sizes turned into bytes so they compare numerically
+        '''
+        columns = {x['name']: x['type'] for x in self.db.execute('PRAGMA table_info(crackmes)')}
+        if columns.get('size') != 'TEXT':
+            return 0
+        from data.crackme import parse_size
+        self.db.create_function('parse_size', 1, parse_size, deterministic=True)
+        fields = ', '.join(FIELDS)
+        self.db.executescript(
+            'BEGIN;'
+            + ''.join(f'DROP INDEX IF EXISTS idx_crackmes_{x};' for x in INDEXED)
+            + 'ALTER TABLE crackmes RENAME TO crackmes_old;'
+            + SCHEMA
+            + f'INSERT INTO crackmes ({fields}, seen_at) SELECT {', '.join('parse_size(size)' if x == 'size' else x for x in FIELDS)}, seen_at FROM crackmes_old;'
+            + 'DROP TABLE crackmes_old;'
+            + 'COMMIT;'
+        )
+        return 1
+
+    def store(self, crackmes: list) -> int:
+        '''
+        Insert or update crackmes, returns how many were stored
+        '''
+        now = time()
+        rows = [[getattr(x, field) for field in FIELDS] + [now] for x in crackmes]
+        if not rows:
+            return 0
+        with self._lock, self.db:
+            self.db.executemany(
+                f'INSERT OR REPLACE INTO crackmes ({', '.join(FIELDS)}, seen_at) VALUES ({', '.join('?' * (len(FIELDS) + 1))})',
+                rows
+            )
+        return len(rows)
+
+    def get(self, filehash: str) -> dict:
+        '''
+        Get a single crackme by filehash, None if unknown
+        '''
+        with self._lock:
+            row = self.db.execute('SELECT * FROM crackmes WHERE filehash = ?', (filehash,)).fetchone()
+        return dict(row) if row else None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.db.execute('SELECT COUNT(*) FROM crackmes').fetchone()[0]
+
+    def query(self, name: str = '', author: str = '', difficulty_min: float = 1, difficulty_max: float = 6, quality_min: float = 1, quality_max: float = 6, lang: str = None, arch: str = None, platform: str = None) -> list:
+        '''
+        Search the catalog like the site search does, most downloaded first
+        '''
+        where = ['difficulty BETWEEN ? AND ?', 'quality BETWEEN ? AND ?']
+        params = [difficulty_min, difficulty_max, quality_min, quality_max]
+        if name:
+            where.append('name LIKE ?')
+            params.append(f'%{name}%')
+        if author:
+            where.append('user LIKE ?')
+            params.append(f'%{author}%')
+        for column, value in (('language', lang), ('arch', arch), ('os', platform)):
+            if value:
+                where.append(f'{column} = ?')
+                params.append(value)
+        with self._lock:
+            rows = self.db.execute(
+                f'SELECT * FROM crackmes WHERE {' AND '.join(where)} ORDER BY downloads DESC',
+                params
+            ).fetchall()
+        return [dict(x) for x in rows]
+
+    def query_key(self, **params) -> str:
+        '''
+        Stable key for a set of search parameters
+        '''
+        return json_dumps(params, sort_keys=True)
+
+    def is_fresh(self, key: str, ttl: float) -> bool:
+        '''
+        Check if the query key was answered by the network within ttl seconds
+        '''
+        with self._lock:
+            row = self.db.execute('SELECT fetched_at FROM queries WHERE key = ?', (key,)).fetchone()
+        return bool(row) and time() - row[0] <= ttl
+
+    def mark_fetched(self, key: str) -> int:
+        '''
+        Remember that the query key was just answered by the network
+        '''
+        with self._lock, self.db:
+            self.db.execute('INSERT OR REPLACE INTO queries (key, fetched_at) VALUES (?, ?)', (key, time()))
+        return 1
+
+    def get_meta(self, key: str, default: str = None) -> str:
+        with self._lock:
+            row = self.db.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key: str, value: str) -> int:
+        with self._lock, self.db:
+            self.db.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+        return 1
+
+    def close(self) -> int:
+        with self._lock:
+            self.db.close()
+        return 1
@@ -10,6 +10,18 @@ COMMANDS = [
             'download_folder': {'type': 'value', 'desc': 'Folder to save downloads'},
             'auto_extract': {'type': 'flag', 'desc': 'Automatically extract archives'},
             'extract_folder': {'type': 'value', 'desc': 'Folder to extract files into'},
+            'workers': {'type': 'value', 'desc': 'Parallel downloads for all'},
+            'per_host': {'type': 'value', 'desc': 'Max connections per host for all'},
+        },
+    },
+    {
+        'name': 'extract',
+        'desc': 'Extract downloaded crackmes in parallel',
+        'args': {
+            'folder': {'type': 'value', 'desc': 'Folder to scan for archives (default downloads)'},
+            'last': {'type': 'flag', 'desc': 'Extract the archives of the last search'},
+            'workers': {'type': 'value', 'desc': 'Number of processes'},
+            'force': {'type': 'flag', 'desc': 'Extract even if already up to date'},
         },
     },
     {
@@ -22,7 +34,14 @@ COMMANDS = [
             'difficulty_max': {'type': 'value', 'desc': 'Maximum difficulty'},
             'quality_min': {'type': 'value', 'desc': 'Minimum quality'},
             'quality_max': {'type': 'value', 'desc': 'Maximum quality'},
-            'lang': {'type': 'value', 'desc': 'Binary Language'}
+            'lang': {'type': 'value', 'desc': 'Binary Language'},
+            'arch': {'type': 'value', 'desc': 'Binary Architecture'},
+            'cached': {'type': 'flag', 'desc': 'Answer from the local catalog if not stale'},
+            'offline': {'type': 'flag', 'desc': 'Answer from the local catalog only'},
+            'ttl': {'type': 'value', 'desc': 'Seconds before cached results are stale'},
+            'enrich': {'type': 'flag', 'desc': 'Add the details only the crackme page has'},
+            'workers': {'type': 'value', 'desc': 'Crackme pages in flight for enrich'},
+            'no_color': {'type': 'flag', 'desc': 'Plain table without colors'}
         },
     },
     {
@@ -30,7 +49,24 @@ COMMANDS = [
         'desc': 'Get the latest crackmes',
         'args': {
             'page': {'type': 'value', 'desc': 'Which page'},
-            'all': {'type': 'flag', 'desc': 'Get all'}
+            'all': {'type': 'flag', 'desc': 'Get all'},
+            'sync': {'type': 'flag', 'desc': 'Only get what is new since the last sync or all'},
+            'window': {'type': 'value', 'desc': 'Pages in flight for all'},
+            'enrich': {'type': 'flag', 'desc': 'Add the details only the crackme page has'},
+            'workers': {'type': 'value', 'desc': 'Crackme pages in flight for enrich'},
+            'no_color': {'type': 'flag', 'desc': 'Plain table without colors'}
+        }
+    },
+    {
+        'name': 'mirror',
+        'desc': 'Download every crackme and write a manifest, resumes where it stopped',
+        'args': {
+            'folder': {'type': 'value', 'desc': 'Mirror folder'},
+            'extract': {'type': 'flag', 'desc': 'Extract every archive'},
+            'restart': {'type': 'flag', 'desc': 'Forget the checkpoint and start over'},
+            'pages': {'type': 'value', 'desc': 'Stop after this many pages'},
+            'window': {'type': 'value', 'desc': 'Listing pages fetched ahead'},
+            'workers': {'type': 'value', 'desc': 'Parallel downloads'},
         }
     },
     {
@@ -57,6 +93,28 @@ COMMANDS = [
             'unignore': {'type': 'value', 'desc': 'remove commands from ignore list. Seperate with comma,'}
         }
     },
+    {
+        'name': 'cache',
+        'desc': 'Show HTTP cache statistics',
+        'args': {
+            'clear': {'type': 'flag', 'desc': 'Remove all cached responses'}
+        }
+    },
+    {
+        'name': 'scheduler',
+        'desc': 'Show request rate limiting and queue statistics',
+        'args': {
+            'reset': {'type': 'flag', 'desc': 'Zero the counters'}
+        }
+    },
+    {
+        'name': 'stats',
+        'desc': 'Show where the time of every command went',
+        'args': {
+            'json': {'type': 'flag', 'desc': 'Print the numbers as JSON'},
+            'reset': {'type': 'flag', 'desc': 'Zero the numbers afterwards'}
+        }
+    },
     {
         'name': 'help',
         'desc': 'Show all commands',
@@ -1,9 +1,19 @@
 # Imports
-from bs4 import BeautifulSoup
-from zipfile import ZipFile
 from urllib.parse import urljoin, urlparse
 import os
 from re import findall as re_findall
+from threading import Lock
+from sys import intern
+from time import perf_counter, monotonic
+from collections import OrderedDict
+from io import BytesIO
+from hashlib import sha256
+from concurrent.futures import ThreadPoolExecutor
+
+from data.parser import get_backend
+from data.archive import extract_archive, bulk_extract, is_extracted, is_complete_zip
+from data.stats import collector, instrument
+from data.scheduler import priority, BULK
 
 # Constants
 COLOR_SCALE = [120, 154, 190, 178, 166, 88]
@@ -36,6 +46,34 @@ def rating_color(rating: int, reverse: bool = False) -> str:
     text_color = 16 if brightness > 127 else 231
     return f'\033[38;5;{text_color}m\033[48;5;{bg_color}m'
 
+def parse_int(value) -> int:
+    '''
+    Turn a counter like '1234' or '1,234' into an int, 0 if it is not a number
+    '''
+    if isinstance(value, int):
+        return value
+    try:
+        return int(float(str(value).replace(',', '')))
+    except ValueError:
+        return 0
+
+def parse_size(value) -> int:
+    '''
+    Turn a size like '12.34 KB' into bytes, 0 if it is not a size
+    '''
+    if isinstance(value, int):
+        return value
+    units = ['BYTES', 'KB', 'MB', 'GB', 'TB', 'PB']
+    parts = str(value or '').upper().split()
+    try:
+        number = float(parts[0])
+    except (IndexError, ValueError):
+        return 0
+    unit = parts[1] if len(parts) > 1 else 'BYTES'
+    if unit in ('B', 'BYTE'):
+        unit = 'BYTES'
+    return int(number * 1024 ** units.index(unit)) if unit in units else int(number)
+
 def get_biggest(x: int, y: int) -> int:
     '''
     Return is the biggest number from x and y
@@ -44,11 +82,19 @@ def get_biggest(x: int, y: int) -> int:
 
 # Classes
 class CrackmeManager:
-    def __init__(self, requests_session, config_manager):
+    def __init__(self, requests_session, config_manager, catalog = None, store = None, scheduler = None):
         self.config = config_manager
         self.requests = requests_session
-        self.last_search = {}
-        self.zip_pw = ['crackmes.one', 'crackmes.de']
+        self.catalog = catalog      # Optional | catalog instance, every parsed crackme is stored in it
+        self.store = store          # Optional | object store instance, archives are kept there by filehash
+        self.scheduler = scheduler  # Optional | request scheduler, streamed downloads count against its bandwidth cap
+        self.last_search = ResultSet()
+        self.zip_pw = list(config_manager.get('zip_passwords', ['crackmes.one', 'crackmes.de']))  # Most recently working first
+        self._pw_lock = Lock()
+        self._row_parser = None  # Set on first parse from the parser_backend config
+        self._csrf_tokens = {}
+        self._info = OrderedDict()  # filehash -> (Crackme from its detail page, when it was fetched), oldest first
+        self._info_lock = Lock()
 
     def _extract_hash(self, download_url: str) -> str:
         '''
@@ -56,71 +102,124 @@ class CrackmeManager:
         '''
         return urlparse(download_url).path.split('/')[-1]
 
-    def get_csrf_token(self, url = 'https://crackmes.one/') -> str:
+    def _cookie_key(self) -> tuple:
         '''
-        Get the CSRF csrf_token of page X
+        Snapshot of the session cookies, a token is only valid for the cookies it was issued with
         '''
-        req = self.requests.get(url)
-        return BeautifulSoup(req.text, 'html.parser').find('input', attrs={"name": "csrf_token"}).get('value', '')
+        return tuple(sorted((x.name, x.value) for x in self.requests.cookies))
+
+    def get_csrf_token(self, url = 'https://crackmes.one/', refresh: bool = False) -> str:
+        '''
+        Get the CSRF csrf_token of page X\n
+        Tokens are cached per url and session cookies, refresh = always fetch a new one
+        '''
+        if not refresh:
+            token = self._csrf_tokens.get((url, self._cookie_key()))
+            if token:
+                return token
+        req = self.requests.get(url, headers={'Cache-Control': 'no-cache'} if refresh else None)
+        from bs4 import BeautifulSoup, SoupStrainer
+        token_input = BeautifulSoup(req.text, 'html.parser', parse_only=SoupStrainer('input', attrs={'name': 'csrf_token'})).find('input')
+        token = token_input.get('value', '') if token_input else ''
+        # Keyed after the request, the page itself might set the CSRF cookie
+        self._csrf_tokens[(url, self._cookie_key())] = token
+        return token
+
+    def _csrf_rejected(self, req) -> bool:
+        return req.status_code in (400, 403) and 'csrf' in req.text.lower()
+
+    def post_form(self, token_url: str, url: str, payload: dict, headers: dict = None):
+        '''
+        POST payload with a cached CSRF token from token_url\n
+        If the server rejects the token it is refreshed and the POST is sent once more
+        '''
+        payload['csrf_token'] = self.get_csrf_token(token_url)
+        req = self.requests.post(url, data=payload, headers=headers)
+        if self._csrf_rejected(req):
+            payload['csrf_token'] = self.get_csrf_token(token_url, refresh=True)
+            req = self.requests.post(url, data=payload, headers=headers)
+        return req
     
-    def _parse_search(self, raw_html: str) -> list:
+    @instrument('parse')
+    def _parse_search(self, raw_html: str) -> 'ResultSet':
         '''
         Parse the html from crackme search
         '''
-        soup = BeautifulSoup(raw_html, 'html.parser')
-        crackmes = {
-            'found': []
-        }
-        longest_user = 0
-        longest_name = 0
-        for tr in soup.find_all('tr', class_='text-center'):
-            tds = tr.find_all('td')
-            href_0 = tds[0].find('a')['href']
+        if self._row_parser is None:
+            self._row_parser = get_backend(self.config.get('parser_backend', 'auto'))
+        crackmes = ResultSet()
+        host = self.config.get('host')
+        for row in self._row_parser(raw_html):
+            tds = row['cells']
+            href_0 = row['href']
             file_hash = self._extract_hash(href_0)
-            username = tds[1].find('a').get_text(strip=True)
-            name = tds[0].get_text(strip=True)
+            username = row['user']
+            name = tds[0]
 
             crackme_info = {
                 'name': name,
-                'url': urljoin(self.config.get('host'), href_0),
-                'download_url': urljoin(self.config.get('host'), f'/static/crackme/{file_hash}.zip'),
+                'url': urljoin(host, href_0),
+                'download_url': urljoin(host, f'/static/crackme/{file_hash}.zip'),
                 'filename': f'{file_hash}.zip',
                 'filehash': file_hash,
                 'user': username,
-                'user_url': tds[1].find('a')['href'],
-                'language': tds[2].get_text(strip=True),
-                'arch': tds[3].get_text(strip=True),
-                'difficulty': max(1.0, min(float(tds[4].get_text(strip=True)), 6.0)), # older crackmes might have > 6 rating
-                'quality': max(1.0, min(float(tds[5].get_text(strip=True)), 6.0)), # older crackmes might have > 6 rating
-                'os': tds[6].get_text(strip=True),
-                'size': tds[7].get_text(strip=True),
-                'date': tds[8].get_text(strip=True),
-                'downloads': re_findall(r'-?\d+\.?\d*', tds[9].get_text(strip=True))[0],
-                'solutions': int(tds[10].get_text(strip=True)),
-                'comments': int(tds[11].get_text(strip=True)),
+                'user_url': row['user_url'],
+                'language': tds[2],
+                'arch': tds[3],
+                'difficulty': max(1.0, min(float(tds[4]), 6.0)), # older crackmes might have > 6 rating
+                'quality': max(1.0, min(float(tds[5]), 6.0)), # older crackmes might have > 6 rating
+                'os': tds[6],
+                'size': tds[7],
+                'date': tds[8],
+                'downloads': re_findall(r'-?\d+\.?\d*', tds[9])[0],
+                'solutions': int(tds[10]),
+                'comments': int(tds[11]),
             }
-            longest_user = get_biggest(len(username), longest_user)
-            longest_name = get_biggest(len(name), longest_name)
-
-            crackmes['found'].append(Crackme(crackme_info, self))
-        crackmes['longest_user'] = longest_user
-        crackmes['longest_name'] = longest_name
+            crackmes.append(Crackme(crackme_info, self))
+        if self.catalog is not None:
+            self.catalog.store(crackmes)
         return crackmes
 
-    def get_latest(self, page: int = 1) -> dict:
+    def _from_catalog(self, rows: list) -> 'ResultSet':
         '''
-        Get the latest crackmes from Page page
+        Build a search result from catalog rows
         '''
-        req = self.requests.get(urljoin(self.config.get('latest_base'),  str(page)))
+        return ResultSet(Crackme(x, self) for x in rows)
+
+    @instrument('get_latest')
+    def get_latest(self, page: int = 1, remember: bool = True, refresh: bool = False) -> 'ResultSet':
+        '''
+        Get the latest crackmes from Page page\n
+        remember = store the result as last_search\n
+        refresh = skip the http cache, the page as it is right now
+        '''
+        req = self.requests.get(urljoin(self.config.get('latest_base'),  str(page)), headers={'Cache-Control': 'no-cache'} if refresh else None)
         crackmes = self._parse_search(req.text)
-        self.last_search = crackmes
+        if remember:
+            self.last_search = crackmes
         return crackmes
 
-    def search(self, name: str = '', author: str = '', difficulty_min: int = 1, difficulty_max: int = 6, quality_min: int = 1, quality_max: int = 6, lang: str = None, arch: str = None, platform: str = None) -> dict:
+    @instrument('search')
+    def search(self, name: str = '', author: str = '', difficulty_min: int = 1, difficulty_max: int = 6, quality_min: int = 1, quality_max: int = 6, lang: str = None, arch: str = None, platform: str = None, cached: bool = False, offline: bool = False, ttl: float = None) -> 'ResultSet':
         '''
-        Search for a crackme
+        Search for a crackme\n
+        cached = answer from the catalog if the same search was done within ttl seconds\n
+        offline = always answer from the catalog
         '''
-        csrf_token = self.get_csrf_token(self.config.get('host') + 'search')
+        query = {
+            'name': name, 'author': author,
+            'difficulty_min': difficulty_min, 'difficulty_max': difficulty_max,
+            'quality_min': quality_min, 'quality_max': quality_max,
+            'lang': lang, 'arch': arch, 'platform': platform
+        }
+        if self.catalog is not None and (cached or offline):
+            key = self.catalog.query_key(**query)
+            ttl = self.config.get('catalog_ttl', 3600) if ttl is None else ttl
+            if offline or self.catalog.is_fresh(key, ttl):
+                crackmes = self._from_catalog(self.catalog.query(**query))
+                self.last_search = crackmes
+                return crackmes
+
         payload = {
             'name': name,
             'author': author,
@@ -138,8 +237,7 @@ class CrackmeManager:
             'size-min-unit': 'KB',
             'size-max': '',
             'size-max-unit': 'MB',
-            'sort_by': 'downloads',
-            'csrf_token': csrf_token
+            'sort_by': 'downloads'
         }
         if lang:
             payload['lang'] = lang
@@ -147,28 +245,35 @@ class CrackmeManager:
             payload['arch'] = arch
         if platform:
             payload['platform'] = platform
-        req = self.requests.post(self.config.get('search'), data=payload, headers=self.requests.headers.update(self.config.get('search_headers')))
+        req = self.post_form(self.config.get('host') + 'search', self.config.get('search'), payload, headers=self.requests.headers.update(self.config.get('search_headers')))
         crackmes = self._parse_search(req.text)
+        if self.catalog is not None:
+            self.catalog.mark_fetched(self.catalog.query_key(**query))
         self.last_search = crackmes
         return crackmes
     
+    @instrument('parse')
     def _parse_info(self, raw_html: str, url: str) -> dict:
         '''
         Parse the html from a specific crackme
         '''
-        soup = BeautifulSoup(raw_html, 'html.parser')
+        from bs4 import BeautifulSoup, SoupStrainer
+        # Class filters in a SoupStrainer miss multi class tags on newer bs4, select the wrapper after parsing
+        soup = BeautifulSoup(raw_html, 'html.parser', parse_only=SoupStrainer('div'))
         container = soup.select_one('.container.grid-lg.wrapper')
         if not container:
-            return info
+            return None
 
         h3 = container.find('h3')
         name = ''.join(c for c in h3.children if isinstance(c, str)).strip()[3:] if h3 else ''
 
         target_div = container.select_one('div.columns.panel-background')
         if not target_div:
-            return info
+            return None
 
-        divs = target_div.find_all('div', recursive=False)[:9]
+        divs = target_div.find_all('div', recursive=False)
+        if len(divs) < 13:
+            return None
         filtered_divs = [d for i, d in enumerate(divs) if i not in (3, 4)]
 
         def extract_text(p, remove_a=False):
@@ -187,13 +292,14 @@ class CrackmeManager:
             ).strip()
 
         details = [extract_text(div.find('p'), remove_a=(i == 4)) for i, div in enumerate(filtered_divs)]
+        description = extract_text(divs[3].find('p'))
 
         user_div = divs[0]
         user_url = urljoin(self.config.get('host'), user_div.find('a')['href'])
         download_div = divs[4]
         download_url = urljoin(self.config.get('host'), download_div.find('a')['href'])
 
-        filehash = self._extract_hash(download_url)
+        filehash = self._extract_hash(download_url).removesuffix('.zip')
         info = {
             'url': url,
             'user_url': user_url,
@@ -208,102 +314,402 @@ class CrackmeManager:
             'arch': details[6],
             'difficulty': details[4],
             'quality': details[5],
-            'downloads': re_findall(r'-?\d+\.?\d*', details[6])[0],
-            'size': details[7],
-            'solutions': details[8],
-            'comments': details[9]
+            'downloads': (re_findall(r'-?\d+\.?\d*', details[7]) or [0])[0],
+            'size': details[8],
+            'solutions': details[9],
+            'comments': details[10],
+            'description': description
         }
         return Crackme(info, self)
     
+    @instrument('get_info')
     def get_info(self, url: str) -> 'Crackme':
         '''
-        Get information about a specific crackme
+        Get information about a specific crackme, every detail page is fetched once
         '''
+        file_hash = self._extract_hash(url)
+        crackme = self._info_get(file_hash)
+        if crackme is not None:
+            return crackme
         req = self.requests.get(url)
-        return self._parse_info(req.text, url)
+        crackme = self._parse_info(req.text, url)
+        if crackme is not None:
+            self._info_put(file_hash, crackme)
+        return crackme
 
-    def extract_zip(self, file: str, output_folder: str, passwords: list, embedded=False) -> int:
+    def _info_get(self, file_hash: str) -> 'Crackme':
         '''
-        Extract the downloaded crackme zip file
+        Remembered detail page of file_hash, None if there is none younger than info_ttl seconds
         '''
-        print(f'Extracting... {'(Embedded)' if embedded else ''}', end=' ', flush=True)
-        for idx, pw in enumerate(passwords):
-            try:
-                print(f'\ntrying: [ {pw} ] {idx+1}/{len(passwords)} ...', end=' ', flush=True)
-                with ZipFile(file) as zf:
-                    zf.extractall(path=output_folder, pwd=bytes(pw, 'utf-8'))
-                    print('[ OK ]', end=' ', flush=True)
-                    names = zf.namelist()
-                    print()
-                    if len(names) != 1 or not names[0].lower().endswith('.zip'):
-                        return 1
-                    return self.extract_zip(os.path.join(output_folder, names[0]), output_folder, passwords, True)
-            except RuntimeError:
-                continue
-            except Exception as e:
-                print(f'[ ERROR ] {e}')
-        print('Failed to extract with provided passwords.')
-        return 0
+        with self._info_lock:
+            entry = self._info.get(file_hash)
+            if entry is None:
+                return None
+            if monotonic() - entry[1] > float(self.config.get('info_ttl', 600)):
+                del self._info[file_hash]
+                return None
+            return entry[0]
 
-    def download(self, download_url: str, dest_folder: str = 'downloads', name: str = '', filename: str = '', chunk_size: int = 8192, auto_extract: bool = True) -> int:
+    def _info_put(self, file_hash: str, crackme: 'Crackme') -> None:
         '''
-        Download crackme
+        Remember a detail page, the oldest are dropped past info_max entries
         '''
-        chunks_done = 0
-        os.makedirs(dest_folder, exist_ok=True)
-        local_path = os.path.join(dest_folder, filename)
-        with self.requests.get(download_url, stream=True) as req:
-            if req.status_code != 200:
-                print(f'Failed to download: {req.status_code}')
+        with self._info_lock:
+            self._info[file_hash] = (crackme, monotonic())
+            self._info.move_to_end(file_hash)
+            while len(self._info) > max(1, int(self.config.get('info_max', 2048))):
+                self._info.popitem(last=False)
+
+    def _get_info_bulk(self, url: str) -> 'Crackme':
+        try:
+            with priority(BULK):
+                return self.get_info(url)
+        except Exception:
+            return None
+
+    def get_info_many(self, urls: list, workers: int = None) -> list:
+        '''
+        get_info for every url with at most workers detail pages in flight\n
+        Results are in input order, None where the page could not be fetched or parsed
+        '''
+        urls = list(urls)
+        if not urls:
+            return []
+        workers = max(1, int(workers or self.config.get('info_workers', 8)))
+        with ThreadPoolExecutor(max_workers=min(workers, len(urls))) as pool:
+            return list(pool.map(self._get_info_bulk, urls))
+
+    def enrich(self, crackmes, workers: int = None) -> int:
+        '''
+        Add what only the detail page has (the description) to every crackme, returns how many got it
+        '''
+        crackmes = list(crackmes)
+        enriched = 0
+        for crackme, info in zip(crackmes, self.get_info_many([x.url for x in crackmes], workers)):
+            if info is not None:
+                crackme.description = info.description
+                enriched += 1
+        return enriched
+
+    def known(self, file_hash: str) -> 'Crackme':
+        '''
+        Crackme with file_hash from an earlier detail page or the catalog, None if it was never seen
+        '''
+        crackme = self._info_get(file_hash)
+        if crackme is not None:
+            return crackme
+        if self.catalog is not None:
+            row = self.catalog.get(file_hash)
+            if row:
+                return Crackme(row, self)
+        return None
+
+    def passwords(self) -> list:
+        '''
+        Copy of the zip passwords, most recently working first\n
+        Extractions iterate the copy, _remember_password reorders the list from other threads
+        '''
+        with self._pw_lock:
+            return list(self.zip_pw)
+
+    def _remember_password(self, password: str) -> int:
+        '''
+        Move the password that just worked to the front of the list and save it
+        '''
+        with self._pw_lock:
+            if not password or not self.zip_pw or self.zip_pw[0] == password:
                 return 0
-            file_size = int(req.headers.get('Content-length', 0))
-            print(f'Downloading {name}: {format_bytes(file_size)}')
-            with open(local_path, 'wb') as f:
+            if password in self.zip_pw:
+                self.zip_pw.remove(password)
+            self.zip_pw.insert(0, password)
+            self.config.update('zip_passwords', list(self.zip_pw))
+            self.config.save_config()
+        return 1
+
+    @instrument('extract')
+    def extract_zip(self, file: str, output_folder: str, passwords: list, quiet: bool = False, source: BytesIO = None) -> int:
+        '''
+        Extract the downloaded crackme zip file, nested single zips included\n
+        The password is probed on the smallest member first, every archive is extracted once\n
+        source = the archive already in memory, file is then only used for the extracted stamp
+        '''
+        if not quiet:
+            print('Extracting...', end=' ', flush=True)
+        result = extract_archive(file, output_folder, passwords, source, self.config.get('extract_memory_limit', 64 * 1024 * 1024))
+        if not result['status']:
+            print(f'Failed to extract {result['error']}')
+            return 0
+        for pw in result['passwords']:
+            self._remember_password(pw)
+        if not quiet:
+            levels = ' -> '.join(x or '(no password)' for x in result['passwords'])
+            print(f'[ OK ] {levels}{f' ({len(result['nested'])} embedded)' if result['nested'] else ''}')
+        return 1
+
+    @instrument('extract')
+    def extract_many(self, archives: list, workers: int = None) -> list:
+        '''
+        Extract archives across a process pool and print a per archive summary
+        '''
+        start = perf_counter()
+        results = bulk_extract(archives, self.passwords(), workers)
+        for x in results:
+            if x['status']:
+                for pw in x['passwords']:
+                    self._remember_password(pw)
+                print(f'[ OK ] {x['file']} {x['seconds']:.2f}s{f' ({len(x['nested'])} embedded)' if x['nested'] else ''}')
+            else:
+                print(f'[ FAILED ] {x['error']}')
+        ok = sum(1 for x in results if x['status'])
+        print(f'Extracted {ok}/{len(results)} archives in {perf_counter() - start:.2f}s')
+        return results
+
+    def _content_range(self, req) -> tuple:
+        '''
+        Parse Content-Range: bytes start-end/total -> (start, total), -1 for unknown parts
+        '''
+        value = req.headers.get('Content-Range', '')
+        try:
+            span, total = value.split(' ', 1)[1].split('/', 1)
+            start = -1 if span == '*' else int(span.split('-', 1)[0])
+            return start, int(total) if total != '*' else -1
+        except (IndexError, ValueError):
+            return -1, -1
+
+    def _download_part(self, download_url: str, part_path: str, name: str, chunk_size: int, quiet: bool, buffer: BytesIO = None) -> int:
+        '''
+        Download into part_path, resumed with a Range request if part_path already has data\n
+        buffer = also keep the data in memory if the file is not bigger than extract_memory_limit\n
+        Returns the expected total size, 0 if unknown, -1 on failure
+        '''
+        offset = os.path.getsize(part_path) if os.path.isfile(part_path) else 0
+        headers = {'Range': f'bytes={offset}-'} if offset else None
+        with self.requests.get(download_url, stream=True, headers=headers) as req:
+            if req.status_code == 416 and offset:
+                # Nothing left to send, the part is complete if it matches the full size
+                _, total = self._content_range(req)
+                if total == offset:
+                    return total
+                os.remove(part_path)
+                return self._download_part(download_url, part_path, name, chunk_size, quiet, buffer)
+            if req.status_code == 206:
+                start, total = self._content_range(req)
+                if start != offset:
+                    print(f'Failed to resume {name}: server sent bytes from {start}, expected {offset}')
+                    return -1
+                mode = 'ab'
+            elif req.status_code == 200:
+                # Range ignored by the server, start over
+                offset = 0
+                total = int(req.headers.get('Content-length', 0))
+                mode = 'wb'
+            else:
+                print(f'Failed to download {name}: {req.status_code}')
+                return -1
+
+            if not quiet:
+                print(f'{'Resuming' if offset else 'Downloading'} {name}: {format_bytes(total)}{f' (from {format_bytes(offset)})' if offset else ''}')
+            if buffer is not None and mode == 'wb':
+                buffer.seek(0)
+                buffer.truncate()
+            keep = buffer is not None and 0 < total <= self.config.get('extract_memory_limit', 64 * 1024 * 1024)
+            chunks_done = offset
+            disk = 0.0
+            with open(part_path, mode) as f:
                 for chunk in req.iter_content(chunk_size=chunk_size):
                     if chunk:
+                        write_start = perf_counter()
                         f.write(chunk)
+                        disk += perf_counter() - write_start
+                        if self.scheduler is not None:
+                            self.scheduler.throttle(len(chunk))
+                        if keep:
+                            buffer.write(chunk)
                         chunks_done += len(chunk)
-                        percent = (chunks_done * 100) / file_size if file_size else 0
-                        print(f'download: [ {percent:.2f}% ]', end='\r')
-        print()
-        if auto_extract:
-            zip_path = os.path.join(dest_folder, filename)
-            self.extract_zip(zip_path, dest_folder, self.zip_pw)
+                        if not quiet:
+                            percent = (chunks_done * 100) / total if total else 0
+                            print(f'download: [ {percent:.2f}% ]', end='\r')
+            collector.add('disk', disk)
+        if not quiet:
+            print()
+        return max(total, 0)
+
+    def _fetch(self, download_url: str, local_path: str, name: str, chunk_size: int, quiet: bool, buffer: BytesIO = None) -> int:
+        '''
+        Download to local_path\n
+        Data is written to local_path.part and resumed from there if interrupted,
+        the file only gets its final name once complete
+        '''
+        os.makedirs(os.path.dirname(local_path) or '.', exist_ok=True)
+        part_path = local_path + '.part'
+        attempts = max(1, int(self.config.get('download_resume_attempts', 3)))
+        for attempt in range(attempts):
+            try:
+                total = self._download_part(download_url, part_path, name, chunk_size, quiet, buffer)
+            except OSError as e:
+                print(f'Download of {name} interrupted: {e}')
+                continue
+            if total < 0:
+                return 0
+            size = os.path.getsize(part_path)
+            if not total or size == total:
+                break
+            print(f'Download of {name} incomplete: {format_bytes(size)} of {format_bytes(total)}')
+        else:
+            return 0
+        os.replace(part_path, local_path)
         return 1
 
+    @instrument('download')
+    def download(self, download_url: str, dest_folder: str = 'downloads', name: str = '', filename: str = '', chunk_size: int = 8192, auto_extract: bool = True, quiet: bool = False, extractor = None, jobs: list = None) -> int:
+        '''
+        Download crackme -> 0 failed, 1 downloaded, 2 already present\n
+        With an object store the archive is kept there once per filehash and
+        dest_folder/filename is a link to it\n
+        Archives up to extract_memory_limit are hashed and extracted from memory,
+        they are never read back from disk\n
+        quiet = no progress output, used when downloading concurrently\n
+        extractor = executor to run the extraction on instead of this thread, its submit may block to bound pending extractions,
+        jobs = list the future of that extraction is appended to
+        '''
+        os.makedirs(dest_folder, exist_ok=True)
+        local_path = os.path.join(dest_folder, filename)
+        buffer = BytesIO()
+        status = 1
+        if self.store is not None:
+            filehash = os.path.splitext(filename)[0]
+            object_path = self.store.path(filehash)
+            if self.store.has(filehash):
+                status = 2
+            elif self.store.meta(filehash) is None and os.path.isfile(local_path) and is_complete_zip(local_path):
+                # Downloaded before the store existed, adopt it unless it was cut short.
+                # With a sidecar the stored object failed its check and local_path may link to it
+                self.store.add(filehash, local_path)
+                status = 2
+            elif self._fetch(download_url, object_path, name, chunk_size, quiet, buffer):
+                buffered = 0 < buffer.getbuffer().nbytes == os.path.getsize(object_path)
+                self.store.add(filehash, object_path, sha256(buffer.getbuffer()).hexdigest() if buffered else None)
+            else:
+                return 0
+            self.store.link(filehash, local_path)
+        elif os.path.isfile(local_path) and is_complete_zip(local_path):
+            status = 2
+        elif not self._fetch(download_url, local_path, name, chunk_size, quiet, buffer):
+            return 0
+
+        if status == 2 and not quiet:
+            print(f'Already downloaded {name}')
+        if auto_extract and not (status == 2 and is_extracted(local_path)):
+            source = buffer if 0 < buffer.getbuffer().nbytes == os.path.getsize(local_path) else None
+            if extractor is not None:
+                job = extractor.submit(self.extract_zip, local_path, dest_folder, self.passwords(), quiet, source)
+                if jobs is not None:
+                    jobs.append(job)
+            else:
+                self.extract_zip(local_path, dest_folder, self.passwords(), quiet=quiet, source=source)
+        return status
+
 class Crackme():
+    __slots__ = (
+        'name', 'url', 'download_url', 'filehash', 'user', 'user_url', 'language', 'arch',
+        'difficulty', 'quality', 'os', 'size', 'date', 'downloads', 'solutions', 'comments', 'description', 'manager'
+    )
+    FIELDS = (
+        'filehash', 'name', 'url', 'download_url', 'filename', 'user', 'user_url', 'language', 'arch',
+        'os', 'difficulty', 'quality', 'size', 'date', 'downloads', 'solutions', 'comments', 'description'
+    )
 
     def __init__(self, info: dict, crackme_manager):
         self.name = info.get('name')
         self.url = info.get('url')
         self.download_url = info.get('download_url')
-        self.filename = info.get('filename')
         self.filehash = info.get('filehash')
-        self.user = info.get('user')
-        self.user_url = info.get('user_url')
-        self.language = info.get('language')
-        self.arch = info.get('arch')
+        # Few distinct values, shared between all instances
+        self.user = intern(info.get('user') or '')
+        self.user_url = intern(info.get('user_url') or '')
+        self.language = intern(info.get('language') or '')
+        self.arch = intern(info.get('arch') or '')
         self.difficulty = float(info.get('difficulty'))
         self.quality = float(info.get('quality'))
-        self.os = info.get('os')
-        self.size = info.get('size')
+        self.os = intern(info.get('os') or '')
+        self.size = parse_size(info.get('size'))
         self.date = info.get('date')
-        self.downloads = info.get('downloads')
-        self.solutions = info.get('solutions')
-        self.comments = info.get('comments')
+        self.downloads = parse_int(info.get('downloads'))
+        self.solutions = parse_int(info.get('solutions'))
+        self.comments = parse_int(info.get('comments'))
+        self.description = info.get('description')  # Only on the detail page, see CrackmeManager.enrich
         self.manager = crackme_manager
-    
+
+    @property
+    def filename(self) -> str:
+        return f'{self.filehash}.zip'
+
+    def to_dict(self) -> dict:
+        '''
+        Plain fields of this crackme, for json output
+        '''
+        return {x: getattr(self, x) for x in self.FIELDS}
+
+    def dest_folder(self, dest_folder: str = 'downloads') -> str:
+        '''
+        Folder this crackme is downloaded to
+        '''
+        return os.path.join(dest_folder, self.user, self.name.replace(' ', '_'))
+
     def download(self, dest_folder: str = 'downloads', chunk_size: int = 8192, auto_extract: bool = True) -> int:
         '''
         Download this crackme
         '''
-        return self.manager.download(self.download_url, os.path.join(dest_folder, self.user, self.name.replace(' ', '_')), self.name, self.filename, chunk_size, auto_extract)
+        return self.manager.download(self.download_url, self.dest_folder(dest_folder), self.name, self.filename, chunk_size, auto_extract)
 
     def extract(self, passwords: list = [], dest_folder='downloads') -> int:
         '''
         Extract this crackme
         '''
         if not len(passwords):
-            passwords = self.zip_pw
-        zip_path = os.path.join(dest_folder, self.filename)
-        return self.manager.extract_zip(zip_path, dest_folder, passwords)
+            passwords = self.manager.passwords()
+        folder = self.dest_folder(dest_folder)
+        return self.manager.extract_zip(os.path.join(folder, self.filename), folder, passwords)
+
+
+class ResultSet():
+    '''
+    Ordered list of Crackme results, indexed by search id\n
+    Keeps the longest user and name for table layout
+    '''
+    __slots__ = ('records', 'longest_user', 'longest_name')
+
+    def __init__(self, records = ()):
+        self.records = []
+        self.longest_user = 0
+        self.longest_name = 0
+        self.extend(records)
+
+    def append(self, crackme: Crackme) -> int:
+        self.records.append(crackme)
+        self.longest_user = get_biggest(len(crackme.user), self.longest_user)
+        self.longest_name = get_biggest(len(crackme.name), self.longest_name)
+        return 1
+
+    def extend(self, crackmes) -> int:
+        for x in crackmes:
+            self.append(x)
+        return 1
+
+    def filter(self, predicate) -> 'ResultSet':
+        '''
+        New result set with the crackmes predicate returns True for
+        '''
+        return ResultSet(x for x in self.records if predicate(x))
+
+    def __getitem__(self, search_id: int) -> Crackme:
+        return self.records[search_id]
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __bool__(self) -> bool:
+        return bool(self.records)
@@ -0,0 +1,144 @@
+# Imports
+from concurrent.futures import ThreadPoolExecutor
+from json import loads as json_loads, dumps as json_dumps
+from threading import Lock
+
+from data.crackme import ResultSet
+from data.scheduler import priority, BULK
+
+# Constants
+MARK_KEY = 'latest_mark'  # catalog meta key, filehashes of the newest page at the last sync
+
+
+# Functions
+def merge_results(pages: list) -> ResultSet:
+    '''
+    Merge parsed result pages (in order) into one result
+    '''
+    found = ResultSet()
+    for page in pages:
+        found.extend(page)
+    return found
+
+
+# Classes
+class LatestCrawler():
+    '''
+    Crawl all latest pages with a window of requests in flight\n
+    The last page is found with an exponential probe + bisection,
+    then the remaining pages are fetched concurrently
+    '''
+
+    def __init__(self, crackme_manager, window: int = 8):
+        self.manager = crackme_manager
+        self.window = max(1, int(window))
+        self._pages = {}
+        self._lock = Lock()
+
+    def _fetch(self, page: int) -> ResultSet:
+        '''
+        Get page as it is right now, every page is only fetched once per crawl
+        '''
+        with self._lock:
+            if page in self._pages:
+                return self._pages[page]
+        # Skip the http cache, a listing up to max_age old hides the newest uploads
+        with priority(BULK):
+            result = self.manager.get_latest(page, remember=False, refresh=True)
+        with self._lock:
+            self._pages[page] = result
+        return result
+
+    def page(self, page: int) -> ResultSet:
+        '''
+        Result of page, from this crawl if it was already fetched
+        '''
+        return self._fetch(page)
+
+    def _has_results(self, page: int) -> bool:
+        return len(self._fetch(page)) > 0
+
+    def find_last_page(self, start: int = 1) -> int:
+        '''
+        Find the last non empty page, returns start - 1 if start is already empty
+        '''
+        if not self._has_results(start):
+            return start - 1
+
+        # Exponential probe: start + 1, start + 2, start + 4, ... until a page is empty
+        low, step = start, 1
+        while self._has_results(start + step):
+            low = start + step
+            step *= 2
+        high = start + step
+
+        # Bisect between the last known full page and the first known empty page
+        while high - low > 1:
+            mid = (low + high) // 2
+            if self._has_results(mid):
+                low = mid
+            else:
+                high = mid
+        return low
+
+    def crawl(self, start: int = 1) -> ResultSet:
+        '''
+        Get all pages from start to the last page, merged in page order
+        '''
+        self._pages = {}
+        last = self.find_last_page(start)
+        if last < start:
+            return merge_results([])
+
+        pages = list(range(start, last + 1))
+        done = 0
+        results = []
+        with ThreadPoolExecutor(max_workers=self.window) as pool:
+            for result in pool.map(self._fetch, pages):
+                results.append(result)
+                done += 1
+                print(f'Getting page {done}/{len(pages)}', end='\r')
+        print()
+        return merge_results(results)
+
+    def remember_mark(self, catalog, newest: ResultSet) -> int:
+        '''
+        Store the filehashes of newest (the first latest page) as the high-water mark
+        '''
+        if not newest:
+            return 0
+        return catalog.set_meta(MARK_KEY, json_dumps([x.filehash for x in newest]))
+
+    def sync(self, catalog, max_pages: int = 20) -> ResultSet:
+        '''
+        Get only the crackmes uploaded since the last sync, newest first\n
+        Pages are walked from 1 until one holds a crackme of the mark, everything before it is new.
+        Without a mark, or if it is not reached within max_pages, the remaining pages are crawled concurrently
+        '''
+        self._pages = {}
+        # The whole first page is the mark, the newest crackme might get deleted
+        mark = set(json_loads(catalog.get_meta(MARK_KEY) or '[]'))
+        new = ResultSet()
+        newest = None
+        page = 1
+        reached = False
+        while mark and page <= max_pages:
+            result = self._fetch(page)
+            if page == 1:
+                newest = result
+            if not result:
+                reached = True
+                break
+            known = next((i for i, x in enumerate(result) if x.filehash in mark), None)
+            if known is not None:
+                new.extend(result.records[:known])
+                reached = True
+                break
+            new.extend(result)
+            page += 1
+
+        if not reached:
+            new.extend(self.crawl(page))
+            newest = newest or self._pages.get(1)
+        self.remember_mark(catalog, newest)
+        return new
@@ -0,0 +1,162 @@
+# Imports
+import os
+import socket
+from json import loads as json_loads, dumps as json_dumps
+
+# Constants
+SUPPORTED = hasattr(socket, 'AF_UNIX')
+
+
+# Functions
+def _send(stream, frame: dict) -> None:
+    stream.write((json_dumps(frame, ensure_ascii=False) + '\n').encode('utf-8'))
+    stream.flush()
+
+def _connect(path: str, timeout: float = None):
+    '''
+    Socket connected to the daemon at path, None if nothing is listening
+    '''
+    if not SUPPORTED or not os.path.exists(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+def forward(path: str, request: dict, out, err) -> int:
+    '''
+    Send request to the daemon at path and copy what it prints to out and err\n
+    Returns the status of the request, None if no daemon is running
+    '''
+    sock = _connect(path)
+    if sock is None:
+        return None
+    with sock, sock.makefile('rwb') as stream:
+        _send(stream, request)
+        for line in stream:
+            frame = json_loads(line)
+            if 'out' in frame:
+                out.write(frame['out'])
+                out.flush()
+            elif 'err' in frame:
+                err.write(frame['err'])
+                err.flush()
+            elif 'status' in frame:
+                return frame['status']
+    # The daemon went away in the middle of the request
+    return 0
+
+def stop(path: str) -> int:
+    '''
+    Ask the daemon at path to shut down, 0 if none is running
+    '''
+    return int(forward(path, {'stop': True}, None, None) is not None)
+
+
+# Classes
+class FrameWriter():
+    '''
+    File like object that sends everything written to it as {name: text} frames
+    '''
+
+    def __init__(self, stream, name: str):
+        self.stream = stream
+        self.name = name
+
+    def write(self, text: str) -> int:
+        if text:
+            _send(self.stream, {self.name: text})
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+    def isatty(self) -> bool:
+        return False
+
+
+class Daemon():
+    '''
+    Keeps one process with its session, login, caches and last results warm\n
+    Clients connect to the Unix socket at path and send one JSON request per connection,
+    what handler prints comes back as out / err frames followed by a status frame.
+    Requests run one after another since commands share state,
+    the daemon quits after idle_timeout seconds without a request (None = never)
+    '''
+
+    def __init__(self, path: str, handler, idle_timeout: float = None):
+        self.path = os.path.abspath(path)
+        self.handler = handler
+        self.idle_timeout = idle_timeout
+        self.running = False
+
+    def _bind(self) -> socket.socket:
+        if _connect(self.path, 1) is not None:
+            raise RuntimeError(f'A daemon is already listening on {self.path}')
+        if os.path.exists(self.path):
+            # Left behind by a daemon that did not shut down cleanly
+            os.remove(self.path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # The socket hands out a logged in session, only the owner may connect
+        old_umask = os.umask(0o177)
+        try:
+            server.bind(self.path)
+        finally:
+            os.umask(old_umask)
+        server.listen(16)
+        server.settimeout(self.idle_timeout)
+        return server
+
+    def _handle(self, conn: socket.socket) -> None:
+        with conn, conn.makefile('rwb') as stream:
+            line = stream.readline()
+            if not line:
+                return
+            request = json_loads(line)
+            if request.get('stop'):
+                self.running = False
+                _send(stream, {'status': 1})
+                return
+            try:
+                status = self.handler(request, FrameWriter(stream, 'out'), FrameWriter(stream, 'err'))
+            except Exception as e:
+                _send(stream, {'err': f'{type(e).__name__}: {e}\n'})
+                status = 0
+            _send(stream, {'status': status})
+
+    def serve(self) -> int:
+        '''
+        Serve requests until stopped or idle, returns 0 if the socket could not be bound
+        '''
+        if not SUPPORTED:
+            print('The daemon needs Unix sockets, not available on this platform')
+            return 0
+        try:
+            server = self._bind()
+        except (RuntimeError, OSError) as e:
+            print(e)
+            return 0
+        print(f'Daemon listening on {self.path}')
+        self.running = True
+        try:
+            while self.running:
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    print('Idle, shutting down')
+                    break
+                conn.settimeout(None)
+                try:
+                    self._handle(conn)
+                except (OSError, ValueError):
+                    # Client went away or sent garbage, the next one is unaffected
+                    continue
+        finally:
+            server.close()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+        return 1
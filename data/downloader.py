@@ -0,0 +1,163 @@
+# Imports
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import BoundedSemaphore, Lock
+from urllib.parse import urlparse
+from time import perf_counter
+import os
+
+from data.crackme import format_bytes
+from data.scheduler import priority, BULK
+
+
+# Classes
+class BoundedExecutor():
+    '''
+    Thread pool whose submit blocks while limit jobs are queued or running
+
+    Each pending extraction holds its archive in memory, so downloads wait for the extractor
+    instead of piling up buffers
+    '''
+
+    def __init__(self, max_workers: int, limit: int):
+        self.pool = ThreadPoolExecutor(max_workers=max_workers)
+        self._slots = BoundedSemaphore(max(1, int(limit)))
+
+    def submit(self, fn, *args, **kwargs):
+        self._slots.acquire()
+        try:
+            future = self.pool.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.pool.shutdown(wait=True)
+
+
+class DownloadResult():
+
+    def __init__(self, index: int, crackme, status: int, size: int = 0, elapsed: float = 0.0, error: str = '', cached: bool = False, extraction = None):
+        self.index = index
+        self.crackme = crackme
+        self.status = status
+        self.cached = cached
+        self.size = size
+        self.elapsed = elapsed
+        self.error = error
+        self.extraction = extraction  # future of the extraction still running, if any
+
+    def finish(self) -> int:
+        '''
+        Fold the outcome of the extraction into status, call once the extractor is done
+        '''
+        if self.extraction is None:
+            return self.status
+        try:
+            extracted = self.extraction.result()
+        except Exception as e:
+            extracted, self.error = 0, f'extraction failed: {e}'
+        else:
+            if not extracted:
+                self.error = 'extraction failed'
+        self.extraction = None
+        if not extracted:
+            self.status = 0
+            self.cached = False
+        return self.status
+
+
+class DownloadPool():
+    '''
+    Download many crackmes at once over the shared session\n
+    workers = threads in flight, per_host = max connections to a single host
+    '''
+
+    def __init__(self, crackme_manager, workers: int = 8, per_host: int = 4, extract_workers: int = 2):
+        self.manager = crackme_manager
+        self.workers = max(1, int(workers))
+        self.per_host = max(1, int(per_host))
+        self.extract_workers = max(1, int(extract_workers))
+        self._host_slots = {}
+        self._lock = Lock()
+
+    def _slot(self, url: str) -> BoundedSemaphore:
+        '''
+        Get the connection semaphore for the host of url
+        '''
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = BoundedSemaphore(self.per_host)
+            return self._host_slots[host]
+
+    def _download_one(self, index: int, crackme, dest_folder: str, auto_extract: bool, extractor) -> DownloadResult:
+        '''
+        Download a single crackme while holding a host slot, extraction is handed to extractor
+        '''
+        start = perf_counter()
+        folder = crackme.dest_folder(dest_folder)
+        jobs = []
+        try:
+            with priority(BULK), self._slot(crackme.download_url):
+                status = self.manager.download(
+                    crackme.download_url,
+                    folder,
+                    crackme.name,
+                    crackme.filename,
+                    auto_extract=auto_extract,
+                    quiet=True,
+                    extractor=extractor,
+                    jobs=jobs
+                )
+        except Exception as e:
+            return DownloadResult(index, crackme, 0, elapsed=perf_counter() - start, error=str(e))
+        if not status:
+            return DownloadResult(index, crackme, 0, elapsed=perf_counter() - start, error='download failed')
+        if status == 2:
+            return DownloadResult(index, crackme, 1, elapsed=perf_counter() - start, cached=True, extraction=jobs[0] if jobs else None)
+        local_path = os.path.join(folder, crackme.filename)
+        size = os.path.getsize(local_path) if os.path.isfile(local_path) else 0
+        return DownloadResult(index, crackme, 1, size, perf_counter() - start, extraction=jobs[0] if jobs else None)
+
+    def run(self, crackmes: list, dest_folder: str = 'downloads', auto_extract: bool = True, quiet: bool = False) -> list:
+        '''
+        Download all crackmes, print per item status and return the results in input order\n
+        quiet = print nothing, the caller reports progress\n
+        Extraction runs on its own threads so the next downloads start right away,
+        at most 2 x extract_workers extractions are pending at once
+        '''
+        total = len(crackmes)
+        results = [None] * total
+        done = 0
+        start = perf_counter()
+        with BoundedExecutor(self.extract_workers, 2 * self.extract_workers) as extractor:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futures = [pool.submit(self._download_one, i, x, dest_folder, auto_extract, extractor) for i, x in enumerate(crackmes)]
+                for future in as_completed(futures):
+                    result = future.result()
+                    results[result.index] = result
+                    done += 1
+                    if quiet:
+                        continue
+                    state = ('[ CACHED ]' if result.cached else '[ OK ]') if result.status else f'[ FAILED ] {result.error}'
+                    print(f'{done}/{total} #{result.index} {result.crackme.name} {format_bytes(result.size)} {state}')
+
+        # The extractor is shut down, every extraction has finished
+        for result in results:
+            if result.extraction is not None and not result.finish() and not quiet:
+                print(f'#{result.index} {result.crackme.name} [ FAILED ] {result.error}')
+
+        if quiet:
+            return results
+        elapsed = perf_counter() - start
+        ok = sum(1 for x in results if x.status)
+        cached = sum(1 for x in results if x.cached)
+        size = sum(x.size for x in results)
+        rate = size / elapsed if elapsed else 0
+        print(f'Downloaded {ok}/{total} crackmes ({cached} already present), {format_bytes(size)} in {elapsed:.2f}s ({format_bytes(rate)}/s)')
+        return results
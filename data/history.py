@@ -0,0 +1,139 @@
+# Imports
+import os
+import atexit
+from bisect import bisect_right
+from itertools import accumulate
+from threading import Lock
+
+
+# Functions
+def tail_lines(path: str, count: int, block_size: int = 64 * 1024) -> list:
+    '''
+    Last count lines of path, only the end of the file is read
+    '''
+    if count <= 0 or not os.path.isfile(path):
+        return []
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        data = b''
+        while pos > 0 and data.count(b'\n') <= count:
+            size = min(block_size, pos)
+            pos -= size
+            f.seek(pos)
+            data = f.read(size) + data
+    return data.decode('utf-8', 'replace').splitlines()[-count:]
+
+
+# Classes
+class History():
+    '''
+    Bounded command history\n
+    Only the last max_entries lines are loaded, appends are buffered and written
+    every flush_every commands and on exit, the file is compacted once it holds
+    twice as much as needed\n
+    Entries get increasing ids, reverse search runs str.rfind over all entries
+    joined into one string with an offset index mapping matches back to ids
+    '''
+
+    def __init__(self, path: str = '.history', max_entries: int = 10000, flush_every: int = 16):
+        self.path = path
+        self.max_entries = max(1, int(max_entries))
+        self.flush_every = max(1, int(flush_every))
+        self.entries = tail_lines(path, self.max_entries)
+        self.base = 0  # id of entries[0]
+        self._pending = []
+        self._lock = Lock()
+        self._text = None     # entries joined by newlines, built on the first search
+        self._offsets = None  # start of every entry in _text
+        atexit.register(self.flush)
+
+    def _build_index(self) -> int:
+        self._text = '\n'.join(self.entries)
+        self._offsets = [0]
+        self._offsets.extend(accumulate(len(x) + 1 for x in self.entries[:-1]))
+        return 1
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __getitem__(self, index: int) -> str:
+        return self.entries[index]
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def append(self, line: str) -> int:
+        '''
+        Add line, written to disk with the next flush
+        '''
+        self.entries.append(line)
+        self._pending.append(line)
+        if self._text is not None:
+            if len(self.entries) > 1:
+                self._offsets.append(len(self._text) + 1)
+                self._text = f'{self._text}\n{line}'
+            else:
+                self._offsets, self._text = [0], line
+
+        # Drop the oldest entries in one go once there are too many
+        overflow = len(self.entries) - self.max_entries
+        if overflow > self.max_entries // 4:
+            del self.entries[:overflow]
+            self.base += overflow
+            self._text = None
+
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+        return 1
+
+    def flush(self) -> int:
+        '''
+        Write buffered entries, compact the file if it got too big
+        '''
+        with self._lock:
+            if not self._pending:
+                return 0
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write('\n'.join(self._pending) + '\n')
+            self._pending = []
+            kept = self.entries[-self.max_entries:]
+            if os.path.getsize(self.path) > 2 * sum(len(x.encode('utf-8')) + 1 for x in kept) and len(self.entries) >= self.max_entries:
+                tmp = self.path + '.tmp'
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    f.write('\n'.join(kept) + '\n')
+                os.replace(tmp, self.path)
+        return 1
+
+    def clear(self) -> int:
+        '''
+        Forget every entry and empty the file
+        '''
+        with self._lock:
+            self.base += len(self.entries)
+            self.entries = []
+            self._text = None
+            self._pending = []
+            open(self.path, 'w').close()
+        return 1
+
+    def search(self, query: str, before: int = None) -> tuple:
+        '''
+        Newest entry containing query with an id below before -> (id, line), (None, None) if nothing matches
+        '''
+        if not query or '\n' in query or not self.entries:
+            return None, None
+        if self._text is None:
+            self._build_index()
+        count = len(self.entries)
+        limit = count if before is None else min(max(before - self.base, 0), count)
+        if limit == 0:
+            # Nothing older than the oldest entry
+            return None, None
+        # A match has to end before the newline in front of entry limit
+        end = len(self._text) if limit == count else self._offsets[limit] - 1
+        pos = self._text.rfind(query, 0, end)
+        if pos < 0:
+            return None, None
+        index = bisect_right(self._offsets, pos) - 1
+        return self.base + index, self.entries[index]
@@ -0,0 +1,61 @@
+# Imports
+from threading import Lock
+
+
+# Functions
+def is_loaded(obj) -> bool:
+    '''
+    False for a LazyObject that was never used, True for anything else
+    '''
+    if type(obj) is not LazyObject:
+        return True
+    return object.__getattribute__(obj, '_lazy_target') is not None
+
+
+# Classes
+class LazyObject():
+    '''
+    Proxy that calls factory on first use and forwards everything to the result\n
+    Lets globals stay globals without paying for them on every start
+    '''
+
+    def __init__(self, factory):
+        object.__setattr__(self, '_lazy_factory', factory)
+        object.__setattr__(self, '_lazy_target', None)
+        object.__setattr__(self, '_lazy_lock', Lock())
+
+    def _lazy_get(self):
+        target = object.__getattribute__(self, '_lazy_target')
+        if target is None:
+            with object.__getattribute__(self, '_lazy_lock'):
+                target = object.__getattribute__(self, '_lazy_target')
+                if target is None:
+                    target = object.__getattribute__(self, '_lazy_factory')()
+                    object.__setattr__(self, '_lazy_target', target)
+        return target
+
+    def __getattr__(self, name: str):
+        return getattr(LazyObject._lazy_get(self), name)
+
+    def __setattr__(self, name: str, value) -> None:
+        setattr(LazyObject._lazy_get(self), name, value)
+
+    def __delattr__(self, name: str) -> None:
+        delattr(LazyObject._lazy_get(self), name)
+
+    def __getitem__(self, key):
+        return LazyObject._lazy_get(self)[key]
+
+    def __len__(self) -> int:
+        return len(LazyObject._lazy_get(self))
+
+    def __iter__(self):
+        return iter(LazyObject._lazy_get(self))
+
+    def __bool__(self) -> bool:
+        return bool(LazyObject._lazy_get(self))
+
+    def __repr__(self) -> str:
+        if not is_loaded(self):
+            return f'<LazyObject {object.__getattribute__(self, '_lazy_factory').__name__} (not loaded)>'
+        return repr(LazyObject._lazy_get(self))
@@ -0,0 +1,196 @@
+# Imports
+import os
+from concurrent.futures import ThreadPoolExecutor
+from json import loads as json_loads, dumps as json_dumps, dump as json_dump
+from time import perf_counter, time
+
+from data.crackme import Crackme, ResultSet, format_bytes
+from data.crawler import LatestCrawler
+from data.downloader import DownloadPool
+from data.scheduler import priority, BULK
+
+
+# Classes
+class Mirror():
+    '''
+    Checkpointed mirror of every crackme, metadata and archives\n
+    Pages are processed oldest first. The checkpoint holds the filehash of the newest
+    mirrored crackme (the anchor), every step takes what is just newer than the anchor
+    from the listing as it is at that moment, so uploads during or between runs never
+    open a gap. Crackmes that failed are kept in the checkpoint and retried first.
+    Only window listing pages and one page of downloads are held in memory
+    '''
+
+    def __init__(self, crackme_manager, folder: str = 'mirror', window: int = 4, workers: int = 8, per_host: int = 4, extract_workers: int = 2):
+        self.manager = crackme_manager
+        self.folder = folder
+        self.window = max(1, int(window))
+        self.pool = DownloadPool(crackme_manager, workers, per_host, extract_workers)
+        self.checkpoint_path = os.path.join(folder, 'checkpoint.json')
+        self.manifest_path = os.path.join(folder, 'manifest.ndjson')
+        self.archive_folder = os.path.join(folder, 'archives')
+
+    def load_checkpoint(self) -> dict:
+        '''
+        anchor = filehash of the newest mirrored crackme, page = listing page just newer than it
+        at the last step, failed = {filehash: crackme fields} still to retry
+        '''
+        if not os.path.isfile(self.checkpoint_path):
+            return {
+                'anchor': None, 'page': None, 'failed': {}, 'manifest_offset': 0,
+                'done': 0, 'ok': 0, 'present': 0, 'bytes': 0, 'seconds': 0.0, 'started_at': time()
+            }
+        with open(self.checkpoint_path, 'r') as f:
+            return json_loads(f.read())
+
+    def save_checkpoint(self, checkpoint: dict) -> int:
+        '''
+        Atomically replace the checkpoint, a crash leaves the old or the new one
+        '''
+        checkpoint['updated_at'] = time()
+        tmp = self.checkpoint_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json_dump(checkpoint, f, indent=4)
+        os.replace(tmp, self.checkpoint_path)
+        return 1
+
+    def _fetch(self, page: int) -> ResultSet:
+        with priority(BULK):
+            return self.manager.get_latest(page, remember=False, refresh=True)
+
+    def _record(self, result) -> dict:
+        crackme = result.crackme
+        return {**crackme.to_dict(), 'status': 'present' if result.cached else 'ok', 'path': os.path.join(crackme.dest_folder(self.archive_folder), crackme.filename)}
+
+    def _position(self, found: ResultSet, anchor: str, per_page: int) -> int:
+        '''
+        Index of anchor on a listing page, everything before it is newer\n
+        Without an anchor everything is newer, as long as the page is the last one (not full)
+        '''
+        if anchor is None:
+            return len(found) if len(found) < per_page else None
+        for i, x in enumerate(found):
+            if x.filehash == anchor:
+                return i
+        return None
+
+    def _newer(self, page: int, first: ResultSet, anchor: str, per_page: int) -> list:
+        '''
+        Crackmes just newer than anchor (newest first) from page as fetched in first,
+        None if anchor is no longer on page or page + 1
+        '''
+        position = self._position(first, anchor, per_page)
+        if position is not None:
+            return first.records[:position]
+        # anchor was further down when first was fetched. Fetching page + 1 afterwards shows
+        # where it is now, uploads in between only make both fetches overlap, never leave a gap
+        second = self._fetch(page + 1)
+        position = self._position(second, anchor, per_page)
+        if position is None:
+            return None
+        seen = {x.filehash for x in first}
+        return first.records + [x for x in second.records[:position] if x.filehash not in seen]
+
+    def _mirror(self, crackmes: list, checkpoint: dict, manifest, extract: bool) -> tuple:
+        '''
+        Download crackmes (oldest first), append the mirrored ones to the manifest,
+        returns (mirrored, bytes)
+        '''
+        results = self.pool.run(ResultSet(crackmes), self.archive_folder, extract, quiet=True)
+        mirrored = [x for x in results if x.status]
+        manifest.write(''.join(json_dumps(self._record(x), ensure_ascii=False) + '\n' for x in mirrored))
+        manifest.flush()
+        for x in results:
+            if x.status:
+                checkpoint['failed'].pop(x.crackme.filehash, None)
+                checkpoint['present' if x.cached else 'ok'] += 1
+            else:
+                checkpoint['failed'][x.crackme.filehash] = {**x.crackme.to_dict(), 'error': x.error}
+        size = sum(x.size for x in mirrored)
+        checkpoint['done'] += len(mirrored)
+        checkpoint['bytes'] += size
+        checkpoint['manifest_offset'] = manifest.tell()
+        return len(mirrored), size
+
+    def run(self, extract: bool = False, restart: bool = False, max_pages: int = None) -> dict:
+        '''
+        Mirror everything not done yet, returns the checkpoint\n
+        max_pages = stop after this many listing pages, the next run continues from there
+        '''
+        os.makedirs(self.folder, exist_ok=True)
+        if restart:
+            for x in (self.checkpoint_path, self.manifest_path):
+                if os.path.isfile(x):
+                    os.remove(x)
+        checkpoint = self.load_checkpoint()
+
+        # Drop manifest lines written after the last checkpoint, they get redone
+        with open(self.manifest_path, 'a') as f:
+            f.truncate(checkpoint['manifest_offset'])
+
+        start = perf_counter()
+        seconds = checkpoint['seconds']
+        run_done = 0
+        run_bytes = 0
+        pages = 0
+        with ThreadPoolExecutor(max_workers=self.window) as listing, open(self.manifest_path, 'a', encoding='utf-8') as manifest:
+            if checkpoint['failed']:
+                print(f'Retrying {len(checkpoint['failed'])} crackmes that failed before')
+                done, size = self._mirror([Crackme(x, self.manager) for x in checkpoint['failed'].values()], checkpoint, manifest, extract)
+                run_done += done
+                run_bytes += size
+                self.save_checkpoint(checkpoint)
+
+            anchor = checkpoint['anchor']
+            page = max(1, checkpoint['page'] or 1)
+            per_page = 0
+            if anchor is None:
+                crawler = LatestCrawler(self.manager, self.window)
+                page = max(1, crawler.find_last_page(1))
+                per_page = len(crawler.page(1))
+                del crawler
+            ahead = {}
+            while page >= 1 and not (max_pages and pages >= max_pages):
+                future = ahead.pop(page, None) or listing.submit(self._fetch, page)
+                for x in range(page - 1, max(0, page - 1 - self.window), -1):
+                    if x not in ahead:
+                        ahead[x] = listing.submit(self._fetch, x)
+                first = future.result()
+                per_page = max(per_page, len(first))
+                newer = self._newer(page, first, anchor, per_page)
+                if newer is None:
+                    if not first:
+                        # Past the end without seeing the anchor, it was deleted from the site
+                        print('The newest mirrored crackme is gone from the listing, checking everything again')
+                        anchor = None
+                        page = max(1, LatestCrawler(self.manager, self.window).find_last_page(1))
+                        continue
+                    # Uploads pushed anchor down by more than a page, look further
+                    page += 1
+                    continue
+
+                done, size = self._mirror(newer[::-1], checkpoint, manifest, extract)
+                run_done += done
+                run_bytes += size
+                if newer:
+                    anchor = newer[0].filehash
+                page -= 1
+                pages += 1
+                checkpoint['anchor'] = anchor
+                checkpoint['page'] = page
+                checkpoint['seconds'] = seconds + perf_counter() - start
+                self.save_checkpoint(checkpoint)
+
+                elapsed = perf_counter() - start
+                rate = run_done / elapsed if elapsed else 0
+                left = page * per_page
+                eta = left / rate if rate else 0
+                print(f'page {page + 1}: {checkpoint['done']} mirrored, {len(checkpoint['failed'])} failed, about {left} left, {format_bytes(run_bytes / elapsed if elapsed else 0)}/s, {rate:.1f} crackmes/s, eta {eta:.0f}s')
+            for x in ahead.values():
+                x.cancel()
+
+        elapsed = perf_counter() - start
+        print(f'Mirrored {run_done} crackmes ({format_bytes(run_bytes)}) in {elapsed:.2f}s, {format_bytes(run_bytes / elapsed if elapsed else 0)}/s')
+        state = 'up to date' if page < 1 else f'continues at page {page}'
+        print(f'{checkpoint['done']} mirrored: {checkpoint['ok']} downloaded, {checkpoint['present']} already present, {len(checkpoint['failed'])} failed, {state}')
+        return checkpoint
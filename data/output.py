@@ -0,0 +1,55 @@
+# Imports
+from sys import stdout as sys_stdout
+from json import dumps as json_dumps
+from time import perf_counter
+
+
+# Classes
+class NdjsonWriter():
+    '''
+    Machine readable output, one JSON object per line\n
+    Every record has a type (crackme, result, error), the command and the batch line it came from.
+    Records of one command are written and flushed together, so a pipeline sees them as soon as the command is done
+    '''
+
+    def __init__(self, out = None):
+        self.out = out or sys_stdout
+        self.records = 0
+        self.begin('', 0)
+
+    def _encode(self, record: dict) -> str:
+        return json_dumps(record, ensure_ascii=False, separators=(',', ':'))
+
+    def write(self, records: list) -> int:
+        if not records:
+            return 0
+        self.out.write('\n'.join(self._encode(x) for x in records) + '\n')
+        self.out.flush()
+        self.records += len(records)
+        return len(records)
+
+    def begin(self, command: str, line: int) -> int:
+        '''
+        Records written from now on belong to command on line
+        '''
+        self.command = command
+        self.line = line
+        self.count = None
+        self.start = perf_counter()
+        return 1
+
+    def crackmes(self, found) -> int:
+        '''
+        One crackme record per result, built straight from the Crackme fields
+        '''
+        self.count = len(found)
+        return self.write([{'type': 'crackme', 'command': self.command, 'line': self.line, 'index': i, **x.to_dict()} for i, x in enumerate(found)])
+
+    def result(self, ok: bool) -> int:
+        record = {'type': 'result', 'command': self.command, 'line': self.line, 'ok': ok, 'seconds': round(perf_counter() - self.start, 6)}
+        if self.count is not None:
+            record['count'] = self.count
+        return self.write([record])
+
+    def error(self, error: str) -> int:
+        return self.write([{'type': 'error', 'command': self.command, 'line': self.line, 'error': error}])
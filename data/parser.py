@@ -0,0 +1,143 @@
+# Imports
+from html.parser import HTMLParser
+from importlib.util import find_spec
+
+# bs4 and lxml are imported by the backends that use them, lxml alone costs ~20ms
+HAS_LXML = find_spec('lxml') is not None
+
+# Constants
+BACKENDS = ['lxml', 'strainer', 'event', 'bs4']
+
+
+# Functions
+def _row(cells: list, href: str, user: str, user_url: str) -> dict:
+    '''
+    Row as returned by every backend, cells is the stripped text of every <td>
+    '''
+    return {'cells': cells, 'href': href, 'user': user, 'user_url': user_url}
+
+def rows_bs4(raw_html: str) -> list:
+    '''
+    Full html.parser tree, the original implementation
+    '''
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(raw_html, 'html.parser')
+    rows = []
+    for tr in soup.find_all('tr', class_='text-center'):
+        tds = tr.find_all('td')
+        user_a = tds[1].find('a')
+        rows.append(_row([x.get_text(strip=True) for x in tds], tds[0].find('a')['href'], user_a.get_text(strip=True), user_a['href']))
+    return rows
+
+def rows_strainer(raw_html: str) -> list:
+    '''
+    Tree restricted to the result rows, built with lxml if installed
+    '''
+    from bs4 import BeautifulSoup, SoupStrainer
+    soup = BeautifulSoup(raw_html, 'lxml' if HAS_LXML else 'html.parser', parse_only=SoupStrainer('tr', class_='text-center'))
+    rows = []
+    for tr in soup.find_all('tr', class_='text-center'):
+        tds = tr.find_all('td')
+        user_a = tds[1].find('a')
+        rows.append(_row([x.get_text(strip=True) for x in tds], tds[0].find('a')['href'], user_a.get_text(strip=True), user_a['href']))
+    return rows
+
+def rows_lxml(raw_html: str) -> list:
+    '''
+    lxml tree walked with xpath, requires lxml
+    '''
+    import lxml.html
+    tree = lxml.html.fromstring(raw_html)
+    rows = []
+    for tr in tree.xpath('//tr[contains(concat(" ", normalize-space(@class), " "), " text-center ")]'):
+        tds = tr.xpath('./td')
+        user_a = tds[1].xpath('.//a')[0]
+        rows.append(_row(
+            [''.join(x.strip() for x in td.itertext()) for td in tds],
+            tds[0].xpath('.//a')[0].get('href'),
+            ''.join(x.strip() for x in user_a.itertext()),
+            user_a.get('href')
+        ))
+    return rows
+
+class _RowExtractor(HTMLParser):
+    '''
+    Event based extractor, never builds a tree
+    '''
+
+    def __init__(self):
+        super().__init__()
+        self.rows = []
+        self._tr_depth = 0
+        self._cells = None
+        self._text = None
+        self._links = None
+        self._in_a = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'tr':
+            if self._tr_depth:
+                self._tr_depth += 1
+            elif 'text-center' in (dict(attrs).get('class') or '').split():
+                self._tr_depth = 1
+                self._cells = []
+                self._links = []
+            return
+        if not self._tr_depth:
+            return
+        if tag == 'td':
+            self._text = []
+            self._links.append(None)
+        elif tag == 'a' and self._text is not None and self._links[-1] is None:
+            self._links[-1] = [dict(attrs).get('href'), []]
+            self._in_a = True
+
+    def handle_endtag(self, tag):
+        if not self._tr_depth:
+            return
+        if tag == 'a':
+            self._in_a = False
+        elif tag == 'td' and self._text is not None:
+            self._cells.append(''.join(self._text))
+            self._text = None
+        elif tag == 'tr':
+            self._tr_depth -= 1
+            if not self._tr_depth:
+                self.rows.append(_row(self._cells, self._links[0][0], ''.join(self._links[1][1]), self._links[1][0]))
+
+    def handle_data(self, data):
+        if self._text is None:
+            return
+        data = data.strip()
+        if data:
+            self._text.append(data)
+            if self._in_a:
+                self._links[-1][1].append(data)
+
+def rows_event(raw_html: str) -> list:
+    '''
+    html.parser events without a tree
+    '''
+    extractor = _RowExtractor()
+    extractor.feed(raw_html)
+    extractor.close()
+    return extractor.rows
+
+def get_backend(name: str = 'auto'):
+    '''
+    Get the row extractor function for backend name\n
+    auto = lxml if installed, else the event extractor
+    '''
+    if name in (None, '', 'auto'):
+        name = 'lxml' if HAS_LXML else 'event'
+    if name == 'lxml' and not HAS_LXML:
+        raise ValueError('lxml is not installed')
+    backends = {
+        'lxml': rows_lxml,
+        'strainer': rows_strainer,
+        'event': rows_event,
+        'bs4': rows_bs4
+    }
+    if name not in backends:
+        raise ValueError(f'Unknown parser backend: {name}')
+    return backends[name]
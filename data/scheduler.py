@@ -0,0 +1,139 @@
+# Imports
+from contextlib import contextmanager
+from heapq import heappush, heappop
+from itertools import count
+from threading import Condition, Lock, local
+from time import monotonic, sleep
+
+# Constants
+INTERACTIVE = 0  # typed by the user: search, info, login
+BULK = 1         # crawls and mass downloads
+PRIORITY_NAMES = {INTERACTIVE: 'interactive', BULK: 'bulk'}
+
+_context = local()
+
+
+# Functions
+@contextmanager
+def priority(level: int):
+    '''
+    Requests made by this thread inside the block use level
+    '''
+    previous = getattr(_context, 'priority', INTERACTIVE)
+    _context.priority = level
+    try:
+        yield level
+    finally:
+        _context.priority = previous
+
+def current_priority() -> int:
+    '''
+    Priority of requests made by this thread, INTERACTIVE unless set with priority()
+    '''
+    return getattr(_context, 'priority', INTERACTIVE)
+
+
+# Classes
+class RequestScheduler():
+    '''
+    Token bucket in front of every request that reaches the network\n
+    rate = requests per second (None = unlimited), burst = requests allowed at once,
+    bandwidth = bytes per second over all responses (None = unlimited)\n
+    Waiting requests are let through by priority, then in arrival order,
+    so a typed search never queues behind a crawl
+    '''
+
+    def __init__(self, rate: float = None, burst: int = 10, bandwidth: float = None):
+        self.rate = float(rate) if rate else None
+        self.burst = max(1, int(burst))
+        self.bandwidth = float(bandwidth) if bandwidth else None
+        self._tokens = float(self.burst)
+        self._updated = monotonic()
+        self._waiting = []     # heap of (priority, seq)
+        self._seq = count()
+        self._cond = Condition(Lock())
+        self._bytes_debt = 0.0  # bytes sent over the cap, paid back by sleeping
+        self._bytes_updated = monotonic()
+        self._bytes_lock = Lock()
+        self.metrics = {x: {'requests': 0, 'waited': 0.0, 'max_wait': 0.0, 'queued': 0, 'max_queued': 0} for x in PRIORITY_NAMES}
+        self.bytes = 0
+        self.throttled = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, level: int = None) -> float:
+        '''
+        Block until a request may go out, returns the seconds waited
+        '''
+        level = current_priority() if level is None else level
+        stats = self.metrics.setdefault(level, {'requests': 0, 'waited': 0.0, 'max_wait': 0.0, 'queued': 0, 'max_queued': 0})
+        start = monotonic()
+        with self._cond:
+            stats['requests'] += 1
+            if self.rate is None:
+                return 0.0
+            ticket = (level, next(self._seq))
+            heappush(self._waiting, ticket)
+            stats['queued'] += 1
+            stats['max_queued'] = max(stats['max_queued'], stats['queued'])
+            while True:
+                now = monotonic()
+                self._refill(now)
+                if self._waiting[0] == ticket and self._tokens >= 1:
+                    heappop(self._waiting)
+                    self._tokens -= 1
+                    stats['queued'] -= 1
+                    # The next in line might be able to go as well
+                    self._cond.notify_all()
+                    break
+                # Only the head needs a timer, everyone else is woken when the head leaves
+                self._cond.wait((1 - self._tokens) / self.rate if self._waiting[0] == ticket else None)
+        waited = monotonic() - start
+        stats['waited'] += waited
+        stats['max_wait'] = max(stats['max_wait'], waited)
+        return waited
+
+    def throttle(self, size: int) -> float:
+        '''
+        Account size received bytes, sleeps while over the bandwidth cap, returns the seconds slept
+        '''
+        with self._bytes_lock:
+            self.bytes += size
+            if self.bandwidth is None:
+                return 0.0
+            now = monotonic()
+            self._bytes_debt = max(0.0, self._bytes_debt - (now - self._bytes_updated) * self.bandwidth) + size
+            self._bytes_updated = now
+            delay = max(0.0, (self._bytes_debt - self.bandwidth) / self.bandwidth)
+        # One second worth of bytes is let through at full speed
+        if delay:
+            sleep(delay)
+            with self._bytes_lock:
+                self.throttled += delay
+        return delay
+
+    def stats(self) -> dict:
+        '''
+        Queue depth and wait times per priority class
+        '''
+        with self._cond:
+            classes = {
+                PRIORITY_NAMES.get(level, str(level)): dict(x, avg_wait=x['waited'] / x['requests'] if x['requests'] else 0.0)
+                for level, x in self.metrics.items()
+            }
+            waiting = len(self._waiting)
+        return {'rate': self.rate, 'burst': self.burst, 'bandwidth': self.bandwidth, 'waiting': waiting, 'bytes': self.bytes, 'throttled': self.throttled, 'classes': classes}
+
+    def reset(self) -> int:
+        '''
+        Zero the counters
+        '''
+        with self._cond:
+            for x in self.metrics.values():
+                x.update(requests=0, waited=0.0, max_wait=0.0, max_queued=x['queued'])
+        with self._bytes_lock:
+            self.bytes = 0
+            self.throttled = 0.0
+        return 1
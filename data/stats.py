@@ -0,0 +1,162 @@
+# Imports
+from contextlib import contextmanager
+from functools import wraps
+from math import ceil, log2
+from threading import Lock
+from time import perf_counter
+
+# Constants
+BUCKETS = 16  # latency histogram buckets, bucket n holds durations <= 2^n ms
+
+
+# Functions
+def bucket(seconds: float) -> int:
+    ms = seconds * 1000
+    return 0 if ms <= 1 else min(BUCKETS - 1, ceil(log2(ms)))
+
+def instrument(name: str):
+    '''
+    Decorator, time every call of the function as name under the running command
+    '''
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                collector.add(name, perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+# Classes
+class Timer():
+    '''
+    Count, total, max and a power of two histogram of durations
+    '''
+    __slots__ = ('count', 'total', 'max', 'histogram')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.histogram = [0] * BUCKETS
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.histogram[bucket(seconds)] += 1
+
+    def percentile(self, p: float) -> float:
+        '''
+        Upper bound in seconds of the bucket holding the p-th percentile
+        '''
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for i, x in enumerate(self.histogram):
+            seen += x
+            if seen >= rank:
+                return min(2 ** i / 1000, self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            'count': self.count, 'total': self.total, 'avg': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(50), 'p95': self.percentile(95), 'max': self.max,
+            'histogram_ms': {f'<={2 ** i}': x for i, x in enumerate(self.histogram) if x}
+        }
+
+
+class Stats():
+    '''
+    Where the time of every command goes\n
+    Timers (network, parse, disk, extract, ...) and counters (requests, bytes, cache hits)
+    are kept per command, the running command is set with measure()
+    '''
+
+    def __init__(self):
+        self.commands = {}
+        self.current = ''
+        self._lock = Lock()
+
+    def _entry(self, command: str) -> dict:
+        entry = self.commands.get(command)
+        if entry is None:
+            entry = self.commands[command] = {'runs': 0, 'timers': {}, 'counters': {}}
+        return entry
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            timers = self._entry(self.current)['timers']
+            timer = timers.get(name)
+            if timer is None:
+                timer = timers[name] = Timer()
+            timer.add(seconds)
+
+    def count(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            counters = self._entry(self.current)['counters']
+            counters[name] = counters.get(name, 0) + value
+
+    @contextmanager
+    def measure(self, command: str):
+        '''
+        Everything recorded inside the block belongs to command
+        '''
+        previous = self.current
+        self.current = command
+        with self._lock:
+            self._entry(command)['runs'] += 1
+        start = perf_counter()
+        try:
+            yield self
+        finally:
+            self.add('total', perf_counter() - start)
+            self.current = previous
+
+    def on_response(self, response, *args, **kwargs):
+        '''
+        requests response hook, counts every request and its latency up to the headers
+        '''
+        if getattr(response, 'from_cache', False):
+            self.count('cache_hits')
+            return response
+        self.count('requests')
+        self.count('bytes', int(response.headers.get('Content-Length') or 0))
+        self.add('network', response.elapsed.total_seconds())
+        return response
+
+    def reset(self) -> int:
+        with self._lock:
+            self.commands = {}
+        return 1
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                command: {'runs': x['runs'], 'counters': dict(x['counters']), 'timers': {k: v.to_dict() for k, v in x['timers'].items()}}
+                for command, x in self.commands.items() if x['runs'] or x['timers'] or x['counters']
+            }
+
+    def report(self) -> str:
+        '''
+        Human readable table of every command
+        '''
+        lines = []
+        for command, x in self.to_dict().items():
+            counters = '  '.join(f'{k}: {v}' for k, v in x['counters'].items())
+            lines.append(f'{command or "(no command)"} x{x['runs']}  {counters}')
+            for name, timer in sorted(x['timers'].items(), key=lambda item: -item[1]['total']):
+                lines.append(
+                    f'    {name:<10} {timer['count']:>7}  total {timer['total']:>8.3f}s  avg {timer['avg'] * 1000:>8.2f}ms'
+                    f'  p50 {timer['p50'] * 1000:>8.2f}ms  p95 {timer['p95'] * 1000:>8.2f}ms  max {timer['max'] * 1000:>8.2f}ms'
+                )
+        return '\n'.join(lines) or 'Nothing measured yet'
+
+
+# Globals
+collector = Stats()
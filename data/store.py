@@ -0,0 +1,110 @@
+# Imports
+import os
+from hashlib import sha256
+from json import loads as json_loads, dump as json_dump
+from shutil import copyfile
+from threading import Lock
+
+
+# Functions
+def file_digest(path: str, chunk_size: int = 1024 * 1024) -> str:
+    '''
+    sha256 of a file
+    '''
+    digest = sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Classes
+class ObjectStore():
+    '''
+    Content addressed store for crackme archives, keyed by filehash\n
+    Every object has a sidecar .json with its size and sha256, checked the first time
+    the object is used in a process. The per user/name folders only hold links into the store
+    '''
+
+    def __init__(self, root: str = 'downloads/.objects'):
+        self.root = root
+        self._verified = set()  # filehashes whose digest matched in this process
+        self._lock = Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, filehash: str) -> str:
+        '''
+        Location of the archive for filehash
+        '''
+        return os.path.join(self.root, filehash[:2], filehash + '.zip')
+
+    def _meta_path(self, filehash: str) -> str:
+        return os.path.join(self.root, filehash[:2], filehash + '.json')
+
+    def meta(self, filehash: str) -> dict:
+        '''
+        Recorded size and digest of filehash, None if not stored
+        '''
+        try:
+            with open(self._meta_path(filehash), 'r') as f:
+                return json_loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def has(self, filehash: str, verify: bool = True) -> bool:
+        '''
+        Check if filehash is stored and matches its recorded size\n
+        verify = also compare the digest, only the first time per object in this process
+        '''
+        meta = self.meta(filehash)
+        path = self.path(filehash)
+        if not meta or not os.path.isfile(path) or os.path.getsize(path) != meta['size']:
+            return False
+        if not verify:
+            return True
+        with self._lock:
+            if filehash in self._verified:
+                return True
+        if file_digest(path) != meta['sha256']:
+            return False
+        with self._lock:
+            self._verified.add(filehash)
+        return True
+
+    def add(self, filehash: str, file: str, digest: str = None) -> str:
+        '''
+        Move file into the store as filehash and record its digest, returns the digest\n
+        digest = sha256 computed while downloading, saves reading the file again
+        '''
+        path = self.path(filehash)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.abspath(file) != os.path.abspath(path):
+            os.replace(file, path)
+        digest = digest or file_digest(path)
+        tmp = self._meta_path(filehash) + '.tmp'
+        with open(tmp, 'w') as f:
+            json_dump({'size': os.path.getsize(path), 'sha256': digest}, f)
+        os.replace(tmp, self._meta_path(filehash))
+        with self._lock:
+            self._verified.add(filehash)
+        return digest
+
+    def link(self, filehash: str, view_path: str) -> int:
+        '''
+        Make view_path point to the stored object\n
+        Hardlink if possible, else symlink, else a copy
+        '''
+        path = self.path(filehash)
+        if os.path.exists(view_path):
+            if os.path.samefile(path, view_path):
+                return 1
+            os.remove(view_path)
+        os.makedirs(os.path.dirname(view_path) or '.', exist_ok=True)
+        try:
+            os.link(path, view_path)
+        except OSError:
+            try:
+                os.symlink(os.path.relpath(path, os.path.dirname(view_path) or '.'), view_path)
+            except OSError:
+                copyfile(path, view_path)
+        return 1
@@ -0,0 +1,96 @@
+# Imports
+import sys
+from shutil import get_terminal_size
+
+from data.crackme import rating_color
+
+# Constants
+RESET = '\033[0m'
+ROW_COLORS = [RESET, '\033[48;2;139;8;8m', '\033[48;2;64;0;64m']
+BAR_WIDTH = 16
+
+
+# Functions
+def add_centered_text(text: str, payload: str) -> str:
+    '''
+    inject playoad (str) in the middle of text
+    '''
+    mid = len(text) // 2
+    return text[:mid] + payload + text[mid:]
+
+def rating_bar(rating: float) -> str:
+    '''
+    16 wide bar for a 1-6 rating with the value in the middle
+    '''
+    filled = int((rating / 6) * BAR_WIDTH)
+    return add_centered_text('#' * filled + ' ' * (BAR_WIDTH - filled), str(rating))
+
+
+# Classes
+class TableRenderer():
+    '''
+    Render result sets as a table\n
+    Bars and colors are only built once per rating value,
+    the output is written once per screenful
+    '''
+
+    def __init__(self, width: int = None, color: bool = True, height: int = None):
+        size = get_terminal_size()
+        self.width = width or size.columns
+        self.height = height or max(1, size.lines)
+        self.color = color
+        self._bars = {}
+        self._rating_colors = {(x, r): rating_color(x, r) for x in range(1, 7) for r in (False, True)}
+
+    def _bar(self, rating: float, reverse: bool, color: bool) -> str:
+        '''
+        [bar] cell for rating, cached
+        '''
+        key = (rating, reverse, color)
+        cell = self._bars.get(key)
+        if cell is None:
+            bar = rating_bar(rating)
+            cell = f'[{self._rating_colors[(int(rating), reverse)]}{bar}{RESET}]' if color else f'[{bar}]'
+            self._bars[key] = cell
+        return cell
+
+    def header(self, found, color: bool = None) -> str:
+        '''
+        Column titles for found
+        '''
+        color = self.color if color is None else color
+        line = f'     Username{' ' * (found.longest_user + 3 - len('Username'))} Name{' ' * (found.longest_name + 1 - len('Name'))} Difficulty{' ' * 12}Quality{' ' * 14}Downloads{' ' * 5}Hash'
+        return line.ljust(self.width) if color else line
+
+    def row(self, crackme_id: int, crackme, longest_user: int, longest_name: int, color: bool = None) -> str:
+        '''
+        One table line
+        '''
+        color = self.color if color is None else color
+        dif = self._bar(crackme.difficulty, False, color)
+        qul = self._bar(crackme.quality, True, color)
+        if not color:
+            return f'{f'#{crackme_id}'.ljust(4)} {crackme.user.ljust(longest_user + 1)}-> {crackme.name.ljust(longest_name)} {dif} {qul} {str(crackme.downloads).ljust(14)}{crackme.filehash}'
+        bg = ROW_COLORS[0] if not crackme_id or crackme_id % 2 == 0 else ROW_COLORS[1 if (crackme_id // 2) % 2 == 0 else 2]
+        # TODO: Emojis are not parsed as 1 character, duh, but messes up spacing
+        return bg + f'{f'#{crackme_id}'.ljust(4)} {crackme.user.ljust(longest_user + 1)}-> {crackme.name.ljust(longest_name)} {dif} {qul}{bg} {str(crackme.downloads).ljust(14)}{crackme.filehash}'.ljust(self.width) + RESET
+
+    def lines(self, found, color: bool = None) -> list:
+        '''
+        Header and every row of found
+        '''
+        lines = [self.header(found, color)]
+        longest_user, longest_name = found.longest_user, found.longest_name
+        lines.extend(self.row(i, x, longest_user, longest_name, color) for i, x in enumerate(found))
+        return lines
+
+    def render(self, found, out = None, color: bool = None) -> int:
+        '''
+        Write the table of found to out, one write per screenful
+        '''
+        out = out or sys.stdout
+        lines = self.lines(found, color)
+        for i in range(0, len(lines), self.height):
+            out.write('\n'.join(lines[i:i + self.height]) + '\n')
+        out.flush()
+        return len(lines) - 1
@@ -1,6 +1,8 @@
 from sys import platform as sys_platform, stdin as sys_stdin, stdout as sys_stdout
 from shlex import split as shlex_split
-from os.path import exists
+
+from data.trie import Trie
+from data.history import History
 
 if sys_platform.startswith('win'):
     import msvcrt
@@ -22,35 +24,58 @@ else:
         return ch
 
 
+def parse_line(line: str, args_info: dict = None) -> tuple:
+    '''
+    Split a command line into (command, {arg: value}), args without = are True for flags
+    '''
+    try:
+        parts = shlex_split(line)
+    except ValueError:
+        parts = line.strip().split()
+
+    if not parts:
+        return '', {}
+
+    cmd = parts[0]
+    args = {}
+    cmd_args = (args_info or {}).get(cmd, {}).get('args', {})
+
+    for part in parts[1:]:
+        if '=' in part:
+            key, val = part.split('=', 1)
+            args[key.strip()] = val.strip()
+        else:
+            # If argument is a flag type, set True, else treat as value with empty string
+            if part in cmd_args and cmd_args[part].get('type') == 'flag':
+                args[part] = True
+            else:
+                args[part] = part  # or True? depends on usage
+    return cmd, args
+
+
 class Terminal():
     RED = '\033[31m'
     BLUE = '\033[94m'
     RESET = '\033[0m'
     DIM = '\033[2m'
 
-    def __init__(self, commands=None, prompt='COCLI > ', history_ignore=[]):
+    def __init__(self, commands=None, prompt='COCLI > ', history_ignore=[], history_max=10000):
         self.COMMANDS = commands or []
         self.history_ignore = history_ignore
         # Prepare easy access dict for command info by name
         self.args_info = {cmd['name']: cmd for cmd in self.COMMANDS}
+        # Completion tries and hints are built once, redraws only look them up
+        self.command_trie = Trie(cmd['name'] for cmd in self.COMMANDS)
+        self.arg_tries = {cmd['name']: Trie(cmd.get('args', {})) for cmd in self.COMMANDS}
+        self.hints = {cmd['name']: self.build_hint(cmd) for cmd in self.COMMANDS}
+        # Argument name -> Trie of values seen in results, e.g. author -> usernames
+        self.value_tries = {}
         self.prompt = prompt
-        self.history = self.history_file(1)
+        self.history = History('.history', history_max)
         self.history_index = None
         self.user_input = ''
         self._last_hint_lines_printed = 0
 
-    def history_file(self, option, data=''):
-        if not exists('.history'):
-            open('.history', 'w').close()
-        if option == 1:
-            return open('.history').read().splitlines()
-        elif option == 2:
-            with open('.history', 'a') as f:
-                f.write(data)
-        elif option == 3:
-            with open('.history', 'w') as f:
-                f.write(data)
-
     def clear_line(self):
         sys_stdout.write('\r\033[K')
 
@@ -69,6 +94,54 @@ class Terminal():
             sys_stdout.write('\n')
             self._last_hint_lines_printed = 1
 
+    def build_hint(self, cmd_info):
+        hint_lines = [cmd_info.get('desc', '')]
+
+        args = cmd_info.get('args', {})
+        if args:
+            hint_lines.append('Arguments:')
+            arg_texts = []
+            max_len = 0
+            for arg_name, arg_data in args.items():
+                arg_type = arg_data.get('type')
+                if arg_type == 'flag':
+                    prefix = '\033[38;5;196m[flag]\033[0m '
+                    display_name = arg_name
+                else:
+                    prefix = '\033[38;5;46m[value]\033[0m'
+                    display_name = arg_name + '=str'
+                text = prefix + display_name
+                arg_texts.append((text, arg_data.get('desc', '')))
+                if len(text) > max_len:
+                    max_len = len(text)
+
+            for text, desc in arg_texts:
+                padded_text = text.ljust(max_len + 2)
+                hint_lines.append(f'  {padded_text}{desc}')
+
+        return '\n'.join(hint_lines)
+
+    def add_values(self, arg_name, values):
+        '''
+        Remember values for completing arg_name=...
+        '''
+        trie = self.value_tries.setdefault(arg_name, Trie())
+        for value in values:
+            if value:
+                trie.insert(value)
+
+    def complete_arg(self, cmd_part, last_arg, longer):
+        '''
+        Completion for the last argument, an argument name or a known value after =
+        '''
+        if '=' in last_arg:
+            key, partial = last_arg.split('=', 1)
+            trie = self.value_tries.get(key)
+            value = trie.shortest(partial, longer) if trie else None
+            return key + '=' + value if value is not None else None
+        trie = self.arg_tries.get(cmd_part)
+        return trie.shortest(last_arg, longer) if trie else None
+
     def print_prompt(self):
         self.clear_line()
         suggestion = ''
@@ -80,50 +153,22 @@ class Terminal():
         cmd_part = parts[0] if parts else ''
 
         if self.user_input and ' ' not in self.user_input:
-            matches = [c['name'] for c in self.COMMANDS if c['name'].startswith(self.user_input) and c['name'] != self.user_input]
-            if matches:
-                shortest = min(matches, key=len)
-                suggestion = shortest[len(self.user_input):]
+            match = self.command_trie.shortest(self.user_input, longer=True)
+            if match:
+                suggestion = match[len(self.user_input):]
                 color = self.RED
 
         elif cmd_part in self.args_info:
-            cmd_info = self.args_info[cmd_part]
-            hint_lines = [cmd_info.get('desc', '')]
-
-            args = cmd_info.get('args', {})
-            if args:
-                hint_lines.append('Arguments:')
-                arg_texts = []
-                max_len = 0
-                for arg_name, arg_data in args.items():
-                    arg_type = arg_data.get('type')
-                    if arg_type == 'flag':
-                        prefix = '\033[38;5;196m[flag]\033[0m '
-                        display_name = arg_name
-                    else:
-                        prefix = '\033[38;5;46m[value]\033[0m'
-                        display_name = arg_name + '=str'
-                    text = prefix + display_name
-                    arg_texts.append((text, arg_data.get('desc', '')))
-                    if len(text) > max_len:
-                        max_len = len(text)
-
-                for text, desc in arg_texts:
-                    padded_text = text.ljust(max_len + 2)
-                    hint_lines.append(f'  {padded_text}{desc}')
-
-            hint = '\n'.join(hint_lines)
+            hint = self.hints[cmd_part]
 
             after_cmd = stripped[len(cmd_part):].lstrip()
             arg_parts = after_cmd.split()
             if arg_parts:
                 last_arg = arg_parts[-1]
-                if '=' not in last_arg:
-                    matches = [a for a in args if a.startswith(last_arg)]
-                    if matches:
-                        shortest = min(matches, key=len)
-                        suggestion = shortest[len(last_arg):]
-                        color = self.BLUE
+                match = self.complete_arg(cmd_part, last_arg, False)
+                if match:
+                    suggestion = match[len(last_arg):]
+                    color = self.BLUE
 
         self.print_hint_line(hint)
         sys_stdout.write(self.prompt + self.user_input)
@@ -131,6 +176,45 @@ class Terminal():
             sys_stdout.write(color + suggestion + self.RESET)
         sys_stdout.flush()
 
+    def print_search(self, query, match):
+        self.clear_line()
+        sys_stdout.write(f"(reverse-i-search)'{query}': {match or ''}")
+        sys_stdout.flush()
+
+    def reverse_search(self):
+        '''
+        Ctrl-R search through the history\n
+        Ctrl-R again = older match, Enter = run the match, Esc/Ctrl-G = cancel, any other key = edit the match\n
+        Returns True if the match should be run
+        '''
+        original = self.user_input
+        query = ''
+        match_id, match = None, None
+        self.clear_previous_hint()
+        self.print_search(query, match)
+        while True:
+            ch = _getch()
+            if ch in ('\r', '\n'):
+                self.user_input = match if match is not None else original
+                return match is not None
+            elif ch in ('\x1b', '\x07', '\x03'):
+                self.user_input = original
+                return False
+            elif ch == '\x12':
+                found_id, found = self.history.search(query, match_id)
+                if found_id is not None:
+                    match_id, match = found_id, found
+            elif ch in ('\x7f', '\b'):
+                query = query[:-1]
+                match_id, match = self.history.search(query)
+            elif ch.isprintable():
+                query += ch
+                match_id, match = self.history.search(query)
+            else:
+                self.user_input = match if match is not None else original
+                return False
+            self.print_search(query, match)
+
     def run(self):
         self.user_input = ''
         self.history_index = None
@@ -152,6 +236,18 @@ class Terminal():
                 self.user_input = self.user_input[:-1]
                 self.print_prompt()
 
+            elif ch == '\x12':
+                # Ctrl-R
+                if self.reverse_search():
+                    self.clear_previous_hint()
+                    self.clear_line()
+                    print()
+                    line = self.user_input
+                    self.user_input = ''
+                    self.history_index = None
+                    return line
+                self.print_prompt()
+
             elif ch == '\x1b':
                 next1 = _getch()
                 next2 = _getch()
@@ -177,22 +273,21 @@ class Terminal():
                 cmd_part = parts[0] if parts else ''
 
                 if len(parts) == 1 and self.user_input:
-                    matches = [c['name'] for c in self.COMMANDS if c['name'].startswith(self.user_input)]
-                    if matches:
-                        self.user_input = min(matches, key=len)
+                    match = self.command_trie.shortest(self.user_input)
+                    if match:
+                        self.user_input = match
                 else:
                     if cmd_part in self.args_info:
-                        args = self.args_info[cmd_part].get('args', {})
                         after_cmd = self.user_input[len(cmd_part):].lstrip()
                         arg_parts = after_cmd.split()
                         if arg_parts:
-                            last_arg = arg_parts[-1]
-                            if '=' not in last_arg:
-                                matches = [a for a in args if a.startswith(last_arg)]
-                                if matches:
-                                    completed = min(matches, key=len)
-                                    arg_parts[-1] = completed
-                                    self.user_input = cmd_part + ' ' + ' '.join(arg_parts)
+                            completed = self.complete_arg(cmd_part, arg_parts[-1], False)
+                            if completed:
+                                key, _, value = completed.partition('=')
+                                if ' ' in value:
+                                    completed = f'{key}="{value}"'
+                                arg_parts[-1] = completed
+                                self.user_input = cmd_part + ' ' + ' '.join(arg_parts)
 
                 self.print_prompt()
 
@@ -202,33 +297,12 @@ class Terminal():
                 self.print_prompt()
 
     def parse_command(self, line):
-        try:
-            parts = shlex_split(line)
-        except ValueError:
-            parts = line.strip().split()
-
-        if not parts:
-            return '', {}
-
-        cmd = parts[0]
-        args = {}
-        cmd_info = self.args_info.get(cmd, {})
-        cmd_args = cmd_info.get('args', {})
-
-        for part in parts[1:]:
-            if '=' in part:
-                key, val = part.split('=', 1)
-                args[key.strip()] = val.strip()
-            else:
-                # If argument is a flag type, set True, else treat as value with empty string
-                if part in cmd_args and cmd_args[part].get('type') == 'flag':
-                    args[part] = True
-                else:
-                    args[part] = part  # or True? depends on usage
+        cmd, args = parse_line(line, self.args_info)
+        if not cmd:
+            return cmd, args
 
         # Save history if command not ignored
         if (len(self.history) == 0 or self.history[-1] != line) and cmd not in self.history_ignore:
             self.history.append(line)
-            self.history_file(2, line+'\n')
 
         return cmd, args
@@ -0,0 +1,84 @@
+# Imports
+from random import uniform
+
+from urllib3.util.retry import Retry
+
+# Constants
+DEFAULTS = {
+    'pool_connections': 4,      # hosts with their own connection pool
+    'pool_maxsize': 16,         # connections kept per host, >= download_workers and crawl_window
+    'pool_block': False,        # wait for a free connection instead of opening a throwaway one
+    'keep_alive': True,
+    'connect_timeout': 5.0,
+    'read_timeout': 30.0,
+    'retries': 3,
+    'backoff_factor': 0.5,      # 0.5s, 1s, 2s, ... between retries
+    'backoff_max': 30.0,
+    'backoff_jitter': 0.5,      # up to this many seconds added to every backoff
+    'retry_statuses': [429, 500, 502, 503, 504],
+    'max_retry_after': 60.0     # never wait longer than this for a Retry-After header
+}
+
+
+# Functions
+def transport_settings(config_manager) -> dict:
+    '''
+    The transport section of the config with defaults for missing keys
+    '''
+    settings = dict(DEFAULTS)
+    settings.update(config_manager.get('transport', {}) or {})
+    return settings
+
+def build_retry(settings: dict) -> 'TransportRetry':
+    '''
+    Retry policy for the adapter, only idempotent methods are retried
+    '''
+    return TransportRetry(
+        total=int(settings['retries']),
+        backoff_factor=float(settings['backoff_factor']),
+        backoff_max=float(settings['backoff_max']),
+        backoff_jitter=float(settings['backoff_jitter']),
+        status_forcelist=settings['retry_statuses'],
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        respect_retry_after_header=True,
+        raise_on_status=False,  # hand the last response to the caller like without retries
+        max_retry_after=float(settings['max_retry_after'])
+    )
+
+def adapter_options(settings: dict) -> dict:
+    '''
+    HTTPAdapter keyword arguments for settings
+    '''
+    return {
+        'pool_connections': int(settings['pool_connections']),
+        'pool_maxsize': int(settings['pool_maxsize']),
+        'pool_block': bool(settings['pool_block']),
+        'max_retries': build_retry(settings)
+    }
+
+def default_timeout(settings: dict) -> tuple:
+    return (float(settings['connect_timeout']), float(settings['read_timeout']))
+
+
+# Classes
+class TransportRetry(Retry):
+    '''
+    Retry with Retry-After capped at max_retry_after\n
+    Jitter comes from urllib3 (backoff_jitter), the cap keeps a server from stalling a crawl for hours
+    '''
+
+    def __init__(self, *args, max_retry_after: float = 60.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_retry_after = max_retry_after
+
+    def new(self, **kwargs) -> 'TransportRetry':
+        retry = super().new(**kwargs)
+        retry.max_retry_after = self.max_retry_after
+        return retry
+
+    def get_retry_after(self, response) -> float:
+        seconds = super().get_retry_after(response)
+        if seconds is None:
+            return None
+        # Spread clients that got the same Retry-After a little
+        return min(seconds, self.max_retry_after) + uniform(0, self.backoff_jitter)
@@ -0,0 +1,68 @@
+# Classes
+class TrieNode():
+    __slots__ = ('children', 'word', 'shortest', 'longer')
+
+    def __init__(self):
+        self.children = {}
+        self.word = False    # A word ends here
+        self.shortest = None # Shortest word in this subtree, this node included
+        self.longer = None   # Shortest word in this subtree that is longer than this node
+
+
+class Trie():
+    '''
+    Prefix tree that answers "shortest word starting with prefix" in O(len(prefix))\n
+    Of two words with the same length the one inserted first wins
+    '''
+
+    def __init__(self, words = ()):
+        self.root = TrieNode()
+        self.size = 0
+        for x in words:
+            self.insert(x)
+
+    def insert(self, word: str) -> int:
+        '''
+        Add word, returns 0 if it was already known
+        '''
+        path = [self.root]
+        node = self.root
+        for ch in word:
+            node = node.children.setdefault(ch, TrieNode())
+            path.append(node)
+        if node.word:
+            return 0
+        node.word = True
+        self.size += 1
+        for x in path:
+            if x.shortest is None or len(word) < len(x.shortest):
+                x.shortest = word
+        for x in path[:-1]:
+            if x.longer is None or len(word) < len(x.longer):
+                x.longer = word
+        return 1
+
+    def _find(self, prefix: str) -> TrieNode:
+        node = self.root
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return None
+        return node
+
+    def shortest(self, prefix: str, longer: bool = False) -> str:
+        '''
+        Shortest word starting with prefix, None if there is none\n
+        longer = skip prefix itself
+        '''
+        node = self._find(prefix)
+        if node is None:
+            return None
+        return node.longer if longer else node.shortest
+
+    def __contains__(self, word: str) -> bool:
+        node = self._find(word)
+        return node is not None and node.word
+
+    def __len__(self) -> int:
+        return self.size
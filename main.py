@@ -1,14 +1,27 @@
 #!/usr/bin/env python3
-from requests import Session
 from urllib.parse import urljoin
 from shutil import get_terminal_size
 from argparse import ArgumentParser
-
-from data.terminal import Terminal
-from data.crackme import CrackmeManager, rating_color, get_biggest
+from contextlib import redirect_stdout
+from json import dumps as json_dumps
+import atexit
+import sys
+import os
+
+# requests (via data.cache), sqlite3 (via data.catalog) and the terminal are
+# imported by the builders below, one-shot runs only pay for what they use
+from data.crackme import CrackmeManager, format_bytes
 from data.account import Acc
 from data.config import ConfigManager
+from data.downloader import DownloadPool
+from data.crawler import LatestCrawler
+from data.mirror import Mirror
+from data.store import ObjectStore
+from data.archive import find_archives, is_extracted
+from data.table import TableRenderer
 from data.commands import COMMANDS
+from data.lazy import LazyObject, is_loaded
+from data.stats import collector
 
 
 # Classes
@@ -24,59 +37,220 @@ class Helper():
         parser.add_argument('-s', '--search', type=str, nargs='+', help='search for crackmes name=Crackme-Name author=Crackme-author difficulty_max=Max-difficulty\
              difficulty_min=Min-difficulty quality_max=Max-quality quality_min=Min-quality')
         parser.add_argument('-l', '--latest', type=str, nargs='+', help='get the latest crackmes page=Page all=(is flag)')
+        parser.add_argument('-x', '--extract', type=str, nargs='+', help='extract downloaded crackmes folder=Folder last=(is flag) workers=Processes force=(is flag)')
         parser.add_argument('-i', '--history', type=str, nargs='+', help='manage your history ignore=Command,Command2 unignore=Command,Command2 nuke=(is flag)')
+        parser.add_argument('-b', '--batch', type=str, help='run the commands in FILE (- = stdin), one per line, results as NDJSON on stdout')
         parser.add_argument('-c', '--continue', action='store_true', help='spawn shell after finishing')
+        parser.add_argument('--no-color', action='store_true', help='plain tables without colors')
+        parser.add_argument('--stats', action='store_true', help='print where the time went to stderr when done')
+        parser.add_argument('--profile', type=str, metavar='FILE', help='run the commands under cProfile, save the stats to FILE')
+        parser.add_argument('-r', '--run', type=str, action='append', metavar='LINE', help='run a shell command line, e.g. -r "login username=Name password=Pass"')
+        parser.add_argument('--daemon', action='store_true', help='stay running in the background, later calls are forwarded to it')
+        parser.add_argument('--daemon-stop', action='store_true', help='stop the running daemon')
+        parser.add_argument('--no-daemon', action='store_true', help='run in this process even if a daemon is running')
 
         return parser.parse_args()
 
-    def generate_terminal_prompt(text: str = '[ USERNAME_PAYLOAD ] # COCLI >', username: str = 'Anon') -> str:
+    def build_http_cache():
+        from data.cache import ResponseCache
+        cache = ResponseCache(
+            config.get('http_cache_dir', 'cache'),
+            max_bytes=int(config.get('http_cache_max_bytes', 50 * 1024 * 1024)),
+            max_age=float(config.get('http_cache_max_age', 300)),
+            save_every=int(config.get('http_cache_save_every', 100))
+        )
+        atexit.register(cache.save_index)
+        return cache
+
+    def build_session():
         '''
-        Generate the prompt for the terminal
+        The one Session shared by everything, its pools keep connections warm for the whole run
         '''
-        return text.replace('USERNAME_PAYLOAD', username)
+        from requests import Session
+        from data.cache import CacheAdapter
+        from data.transport import transport_settings, adapter_options, default_timeout
+        transport = transport_settings(config)
+        session = Session()
+        session.headers = {
+            'User-Agent': f'COCLI/5.0 (X11; Python3 x86_64; rv:0.3.0) COCLI/{__version__}',
+            'Content-Type': 'application/x-www-form-urlencoded'
+        }
+        if not transport['keep_alive']:
+            session.headers['Connection'] = 'close'
+        session.hooks['response'].append(collector.on_response)
+        cache_adapter = CacheAdapter(
+            http_cache,
+            prefixes=[config.get(x) for x in ('latest_base', 'crackme_base', 'search', 'login')],
+            timeout=default_timeout(transport),
+            scheduler=scheduler,
+            **adapter_options(transport)
+        )
+        session.mount('https://', cache_adapter)
+        session.mount('http://', cache_adapter)
+        return session
 
-    def _add_centered_text(text: str, payload: str) -> str:
+    def build_scheduler():
+        from data.scheduler import RequestScheduler
+        settings = config.get('scheduler', {}) or {}
+        return RequestScheduler(settings.get('rate'), settings.get('burst', 10), settings.get('bandwidth'))
+
+    def build_catalog():
+        from data.catalog import Catalog
+        return Catalog(config.get('catalog_file', 'data/catalog.db'))
+
+    def build_store():
+        return ObjectStore(config.get('object_store', 'downloads/.objects'))
+
+    def build_crackmes():
+        return CrackmeManager(requests, config, catalog, store, scheduler)
+
+    def build_terminal():
         '''
-        inject playoad (str) in the middle of text
+        The interactive terminal, only needed once a shell is spawned
         '''
-        mid = len(text) // 2
-        return text[:mid] + payload + text[mid:]
+        from data.terminal import Terminal
+        username = acc.username if acc.logged_in and acc.username else 'Anon'
+        return Terminal(commands=COMMANDS, prompt=Helper.generate_terminal_prompt(username=username), history_ignore=history_ignore, history_max=config.get('history_max', 10000))
 
+    def generate_terminal_prompt(text: str = '[ USERNAME_PAYLOAD ] # COCLI >', username: str = 'Anon') -> str:
+        '''
+        Generate the prompt for the terminal
+        '''
+        return text.replace('USERNAME_PAYLOAD', username)
 
     def download(search_id: int = None, download_url: str = None, challenge_hash: str = None, auto_extract: bool = True) -> int:
         '''
         Download crackme
         '''
         if search_id != None:
-            return crackmes.last_search['found'][int(search_id)].download(auto_extract=auto_extract)
+            return crackmes.last_search[int(search_id)].download(auto_extract=auto_extract)
         elif download_url != None:
-            crackme_page = urljoin(config.get('crackme_base'), crackmes._extract_hash(download_url))
-        elif challenge_hash != None:
-            crackme_page = urljoin(config.get('crackme_base'), challenge_hash)
-        else:
+            challenge_hash = crackmes._extract_hash(download_url).removesuffix('.zip')
+        elif challenge_hash == None:
             print('atleast 1 option is required')
             return 0
-        crackme_instance = crackmes.get_info(crackme_page)
+        # Already seen in a search or listing, no detail page needed
+        crackme_instance = crackmes.known(challenge_hash) or crackmes.get_info(urljoin(config.get('crackme_base'), challenge_hash))
+        if crackme_instance is None:
+            print(f'Could not get crackme {challenge_hash}')
+            return 0
         download_status = crackme_instance.download()
 
         return download_status
     
-    def crackme_display(crackme_id: int, user: str, name: str, difficulty: float, quality: float, downloads: int, filehash: str, longest_user: int, longest_name: int) -> str:
+    def run_command(cmd: str, args: dict) -> int:
         '''
-        Generate UI for Crackme
+        handle_command with everything it does recorded under cmd
         '''
-        if not crackme_id or crackme_id % 2 == 0:
-            color = '\033[0m'
-        else:
-            color = '\033[48;2;139;8;8m' if (crackme_id // 2) % 2 == 0 else '\033[48;2;64;0;64m'
-
-        dif_calc, qul_calc = int((difficulty / 6) * 16), int((quality / 6) * 16)
-        dif, qul = Helper._add_centered_text('#' * dif_calc + ' ' * (16 - dif_calc), str(difficulty)), Helper._add_centered_text('#' * qul_calc + ' ' * (16 - qul_calc), str(quality))
-        dif_color = rating_color(int(difficulty))
-        qul_color = rating_color(int(quality), True)
-        # TODO: Emojis are not parsed as 1 character, duh, but messes up spacing
-        return color + f'#{crackme_id}{space(3 - len(str(crackme_id)))} {user}{space(longest_user+1 - len(user))}-> {name}{space(longest_name - len(name))} [{dif_color}{''.join(dif)}\033[0m] [{qul_color}{''.join(qul)}\033[0m]{color} {downloads}{space(14 - len(str(downloads)))}{filehash}'.ljust(width) + '\033[0m'
-    
+        if not cmd:
+            return handle_command(cmd, args)
+        with collector.measure(cmd):
+            return handle_command(cmd, args)
+
+    def dump_profile(profiler, path: str) -> int:
+        '''
+        Save the cProfile stats to path and print the top of them to stderr
+        '''
+        from pstats import Stats
+        profiler.dump_stats(path)
+        Stats(profiler, stream=sys.stderr).sort_stats('cumulative').print_stats(25)
+        print(f'Profile saved to {path}', file=sys.stderr)
+        return 1
+
+    def show_results(found, args: dict) -> int:
+        '''
+        Table in the shell, NDJSON records in batch mode
+        '''
+        if batch_output is not None:
+            return batch_output.crackmes(found)
+        table.render(found, color=False if 'no_color' in args else None)
+        return Helper.remember_values(found)
+
+    def enrich(found, args: dict) -> int:
+        '''
+        Fetch the detail pages of found if the enrich flag is given
+        '''
+        if not str(args.get('enrich', False)).lower() in ['1', 'true', 'yes'] or not found:
+            return 0
+        enriched = crackmes.enrich(found, int(args.get('workers', config.get('info_workers', 8))))
+        print(f'Enriched {enriched}/{len(found)} crackmes')
+        return enriched
+
+    def run_batch(path: str) -> int:
+        '''
+        Run every command in path (- = stdin) in this process\n
+        Results go to stdout as NDJSON, progress and messages to stderr.
+        Returns 0 if any command failed
+        '''
+        global batch_output
+        from data.output import NdjsonWriter
+        from data.terminal import parse_line
+        args_info = {x['name']: x for x in COMMANDS}
+        batch_output = NdjsonWriter(sys.stdout)
+        source = sys.stdin if path == '-' else open(path, 'r', encoding='utf-8')
+        failed = 0
+        try:
+            with redirect_stdout(sys.stderr):
+                for number, line in enumerate(source, 1):
+                    line = line.strip()
+                    if not line or line.startswith('#'):
+                        continue
+                    cmd, cmd_args = parse_line(line, args_info)
+                    batch_output.begin(cmd, number)
+                    try:
+                        status = Helper.run_command(cmd, cmd_args)
+                    except SystemExit:
+                        break
+                    except Exception as e:
+                        batch_output.error(f'{type(e).__name__}: {e}')
+                        failed += 1
+                        continue
+                    ok = status != 0
+                    failed += not ok
+                    batch_output.result(ok)
+        finally:
+            if source is not sys.stdin:
+                source.close()
+            batch_output = None
+        return int(not failed)
+
+    def serve_request(request: dict, out, err) -> int:
+        '''
+        Run the commands a client forwarded to the daemon, in its folder and with its terminal width
+        '''
+        from data.terminal import parse_line
+        args_info = {x['name']: x for x in COMMANDS}
+        commands = [tuple(x) for x in request.get('commands', [])] + [parse_line(x, args_info) for x in request.get('run', [])]
+        table.width = request.get('width') or table.width
+        table.color = config.get('color', True) and not request.get('no_color')
+        failed = 0
+        cwd = os.getcwd()
+        try:
+            os.chdir(request.get('cwd', cwd))
+            with redirect_stdout(out):
+                for cmd, cmd_args in commands:
+                    if cmd == 'exit':
+                        print('Use --daemon-stop to stop the daemon')
+                        continue
+                    failed += not Helper.run_command(cmd, cmd_args)
+            if request.get('stats'):
+                err.write(collector.report() + '\n')
+        finally:
+            os.chdir(cwd)
+        return int(not failed)
+
+    def remember_values(found) -> int:
+        '''
+        Make values of found completable in the terminal
+        '''
+        if not is_loaded(term):
+            return 0
+        term.add_values('author', (x.user for x in found))
+        term.add_values('lang', (x.language for x in found))
+        term.add_values('arch', (x.arch for x in found))
+        term.add_values('hash', (x.filehash for x in found))
+        return 1
+
     def login(use_cookie: bool, username: str, password: str, save: bool = False) -> int:
         '''
         Login to your crackmes account
@@ -96,7 +270,9 @@ class Helper():
         logged_in = acc.login(use_cookie, username, password, save)
         acc.logged_in = logged_in
         if logged_in:
-            term.prompt = Helper.generate_terminal_prompt(username=username)
+            acc.username = username
+            if is_loaded(term):
+                term.prompt = Helper.generate_terminal_prompt(username=username)
         return logged_in
     
     def logout() -> int:
@@ -107,32 +283,36 @@ class Helper():
         if not acc.logged_in:
             print('Already not logged in')
             return 1
-        term.prompt = Helper.generate_terminal_prompt()
+        if is_loaded(term):
+            term.prompt = Helper.generate_terminal_prompt()
         return acc.logout()
 
 
 # Globals
 __version__ = '0.4.0-alpha'
-requests = Session()
-requests.headers = {
-    'User-Agent': f'COCLI/5.0 (X11; Python3 x86_64; rv:0.3.0) COCLI/{__version__}',
-    'Content-Type': 'application/x-www-form-urlencoded'
-}
-
-config = ConfigManager('data/config.json')
+# COCLI_CONFIG = other config file, used by the benchmarks
+config = ConfigManager(os.environ.get('COCLI_CONFIG', 'data/config.json'))
+
+# Built on first use
+http_cache = LazyObject(Helper.build_http_cache)
+scheduler = LazyObject(Helper.build_scheduler)
+requests = LazyObject(Helper.build_session)
+catalog = LazyObject(Helper.build_catalog)
+store = LazyObject(Helper.build_store)
+crackmes = LazyObject(Helper.build_crackmes)
 acc = Acc(requests_session=requests, config_manager=config)
-crackmes = CrackmeManager(requests, config)
 acc.crackmes = crackmes
 
 # Don't save said command in history
 history_ignore = config.get('history_ignore', [])
 
 width = get_terminal_size().columns
-term = Terminal(commands=COMMANDS, prompt=Helper.generate_terminal_prompt(), history_ignore = history_ignore)
+table = TableRenderer(width, color=config.get('color', True))
+term = LazyObject(Helper.build_terminal)
+# Set while a batch runs, results are written as NDJSON instead of tables
+batch_output = None
 
 
-def space(size: int) -> str: return ' ' * size
-
 def handle_command(cmd: str, args: dict) -> int:
     match cmd:
         case 'exit':
@@ -140,17 +320,36 @@ def handle_command(cmd: str, args: dict) -> int:
             exit()
 
         case 'download':
-            url = args.get('url', '')
-            challenge_hash = args.get('hash', '')
-            search_id = args.get('search_id', '')
+            url = args.get('url')
+            challenge_hash = args.get('hash')
+            search_id = args.get('search_id')
             auto_extract = args.get('auto_extract', True)
             auto_extract = str(auto_extract).lower() in ['1', 'true', 'yes']
             if 'all' in args:
-                for i in range(len(crackmes.last_search['found'])):
-                    Helper.download(i, None, None)
-                return
-            Helper.download(search_id, url, challenge_hash)
+                pool = DownloadPool(
+                    crackmes,
+                    workers=int(args.get('workers', config.get('download_workers', 8))),
+                    per_host=int(args.get('per_host', config.get('download_per_host', 4))),
+                    extract_workers=int(config.get('download_extract_workers', 2))
+                )
+                results = pool.run(crackmes.last_search, auto_extract=auto_extract)
+                return int(all(x.status for x in results))
+            return int(Helper.download(search_id, url, challenge_hash) > 0)
             
+        case 'extract':
+            force = str(args.get('force', False)).lower() in ['1', 'true', 'yes']
+            if 'last' in args:
+                archives = [os.path.join(x.dest_folder(), x.filename) for x in crackmes.last_search]
+                archives = [x for x in archives if os.path.isfile(x) and (force or not is_extracted(x))]
+            else:
+                archives = find_archives(args.get('folder', 'downloads'), force)
+            if not archives:
+                print('Nothing to extract')
+                return 1
+            workers = int(args['workers']) if 'workers' in args else config.get('extract_workers')
+            print(f'Extracting {len(archives)} archives')
+            crackmes.extract_many(archives, workers)
+
         case 'search':
             found = crackmes.search(
                 args.get('name', ''),
@@ -158,41 +357,50 @@ def handle_command(cmd: str, args: dict) -> int:
                 difficulty_min=int(args.get('difficulty_min', 1)),
                 difficulty_max=int(args.get('difficulty_max', 6)),
                 quality_min=int(args.get('quality_min', 1)),
-                quality_max=int(args.get('quality_max', 6))
+                quality_max=int(args.get('quality_max', 6)),
+                lang=args.get('lang'),
+                arch=args.get('arch'),
+                cached=str(args.get('cached', False)).lower() in ['1', 'true', 'yes'],
+                offline=str(args.get('offline', False)).lower() in ['1', 'true', 'yes'],
+                ttl=float(args['ttl']) if 'ttl' in args else None
             )
-            i = 0
-            print(f'{space(5 - len(str(i)))} Username{space(found['longest_user'] + 3 - len('Username'))} Name{space(found['longest_name'] + 1 - len('Name'))} Difficulty{space(12)}Quality{space(14)}Downloads{space(5)}Hash'.ljust(width))
-            for x in found['found']:
-                print(Helper.crackme_display(i, x.user, x.name, x.difficulty, x.quality, x.downloads, x.filehash, found['longest_user'], found['longest_name']))
-                i += 1
+            Helper.enrich(found, args)
+            Helper.show_results(found, args)
 
         case 'latest':
             get_all = args.get('all', False)
             page = int(args.get('page', 1))
-            found = {
-                'longest_user': 0,
-                'longest_name': 0,
-                'found': []
-            }
-            if get_all:
-                cur = page
-                while True:
-                    print(f'Getting page {cur}', end='\r')
-                    tmp = crackmes.get_latest(cur)
-                    if tmp['found'] == []:
-                        break
-                    found.setdefault('found', []).extend(tmp['found'])
-                    found['longest_name'] = get_biggest(found['longest_name'], tmp['longest_name'])
-                    found['longest_user'] = get_biggest(found['longest_user'], tmp['longest_user'])
-                    cur += 1
+            crawler = LatestCrawler(crackmes, window=int(args.get('window', config.get('crawl_window', 8))))
+            if 'sync' in args:
+                found = crawler.sync(catalog, int(config.get('sync_max_pages', 20)))
+                crackmes.last_search = found
+                print(f'{len(found)} new crackmes since the last sync')
+            elif get_all:
+                found = crawler.crawl(page)
                 crackmes.last_search = found
+                if page == 1:
+                    # Everything is in the catalog now, the next sync starts from here
+                    crawler.remember_mark(catalog, crawler.page(1))
             else:
                 found = crackmes.get_latest(page)
-            i = 0
-            print(f'{space(5 - len(str(i)))} Username{space(found['longest_user'] + 3 - len('Username'))} Name{space(found['longest_name'] + 1 - len('Name'))} Difficulty{space(12)}Quality{space(14)}Downloads{space(5)}Hash'.ljust(width))
-            for x in found['found']:
-                print(Helper.crackme_display(i, x.user, x.name, x.difficulty, x.quality, x.downloads, x.filehash, found['longest_user'], found['longest_name']))
-                i += 1
+            Helper.enrich(found, args)
+            Helper.show_results(found, args)
+
+        case 'mirror':
+            mirror = Mirror(
+                crackmes,
+                args.get('folder', config.get('mirror_folder', 'mirror')),
+                window=int(args.get('window', config.get('mirror_window', 4))),
+                workers=int(args.get('workers', config.get('download_workers', 8))),
+                per_host=int(config.get('download_per_host', 4)),
+                extract_workers=int(config.get('download_extract_workers', 2))
+            )
+            checkpoint = mirror.run(
+                extract=str(args.get('extract', False)).lower() in ['1', 'true', 'yes'],
+                restart=str(args.get('restart', False)).lower() in ['1', 'true', 'yes'],
+                max_pages=int(args['pages']) if 'pages' in args else None
+            )
+            return int(not checkpoint['failed'])
 
         case 'login':
             use_cookie = args.get('use_cookie')
@@ -209,8 +417,7 @@ def handle_command(cmd: str, args: dict) -> int:
             nuke = args.get('nuke', True)
             nuke = str(nuke).lower() in ['1', 'true', 'yes']
             if nuke:
-                term.history = []
-                term.history_file(3, '')
+                term.history.clear()
                 
             unignore = args.get('unignore', '')
             if unignore:
@@ -223,6 +430,33 @@ def handle_command(cmd: str, args: dict) -> int:
             config.update('history_ignore', term.history_ignore)
             config.save_config()
 
+        case 'cache':
+            if str(args.get('clear', False)).lower() in ['1', 'true', 'yes']:
+                http_cache.clear()
+                print('Cache cleared')
+            stats = http_cache.stats()
+            print(f'Entries: {stats['entries']}  Size: {format_bytes(stats['bytes'])} ({format_bytes(stats['disk_bytes'])} on disk, max {format_bytes(stats['max_bytes'])})')
+            print(f'Hits: {stats['hits']}  Misses: {stats['misses']}  Revalidated: {stats['revalidated']}  Saved: {format_bytes(stats['bytes_saved'])}')
+
+        case 'scheduler':
+            if str(args.get('reset', False)).lower() in ['1', 'true', 'yes']:
+                scheduler.reset()
+            stats = scheduler.stats()
+            rate = f'{stats['rate']:g}/s (burst {stats['burst']})' if stats['rate'] else 'unlimited'
+            bandwidth = f'{format_bytes(stats['bandwidth'])}/s' if stats['bandwidth'] else 'unlimited'
+            print(f'Rate: {rate}  Bandwidth: {bandwidth}  Waiting: {stats['waiting']}')
+            print(f'Received: {format_bytes(stats['bytes'])}  Throttled: {stats['throttled']:.2f}s')
+            for name, x in stats['classes'].items():
+                print(f'{name:<12} requests: {x['requests']:<6} queued: {x['queued']} (max {x['max_queued']})  wait avg: {x['avg_wait'] * 1000:.1f}ms max: {x['max_wait'] * 1000:.1f}ms')
+
+        case 'stats':
+            if str(args.get('json', False)).lower() in ['1', 'true', 'yes']:
+                print(json_dumps(collector.to_dict(), indent=4))
+            else:
+                print(collector.report())
+            if str(args.get('reset', False)).lower() in ['1', 'true', 'yes']:
+                collector.reset()
+
         case 'help':
             print('Commands:', ', '.join(x['name'] for x in COMMANDS))
             print('Use arguments as key=value, e.g. search author=John name=CrackMe')
@@ -232,6 +466,7 @@ def handle_command(cmd: str, args: dict) -> int:
 
         case _:
             print(f'Unknown command: {cmd}')
+            return 0
     return 1
 
 def main() -> int:
@@ -246,7 +481,7 @@ def main() -> int:
         # If you comment this out the line with the command will be cleared, needs fix maybe
         print('\n')
 
-        handle_command(cmd, args)
+        Helper.run_command(cmd, args)
 
     return 1
 
@@ -261,11 +496,58 @@ if __name__ == '__main__':
         )
         for k, v in args_raw.items()
     }
-    for command, arguments in args.items():
-        if command in ['continue', 'auto_extract', 'nuke'] or arguments == None:
-            continue
+    if args['no_color']:
+        table.color = False
+    profiler = None
+    if args_raw['profile']:
+        from cProfile import Profile
+        profiler = Profile()
+        profiler.enable()
+
+    if args['daemon_stop']:
+        from data.daemon import stop
+        exit(0 if stop(config.get('daemon_socket', 'data/cocli.sock')) else 1)
+    if args['daemon']:
+        from data.daemon import Daemon
+        idle = config.get('daemon_idle_timeout')
+        exit(0 if Daemon(config.get('daemon_socket', 'data/cocli.sock'), Helper.serve_request, float(idle) if idle else None).serve() else 1)
+
+    commands = [
+        (command, arguments) for command, arguments in args.items()
+        if command not in ['continue', 'auto_extract', 'nuke', 'no_color', 'batch', 'stats', 'profile', 'run', 'daemon', 'daemon_stop', 'no_daemon'] and arguments != None
+    ]
+    lines = args_raw['run'] or []
+    if commands or lines:
+        shell = False
+
+    forwarded = None
+    if (commands or lines) and not (args['no_daemon'] or args['continue'] or profiler):
+        # A running daemon already has the session, login and caches warm
+        from data.daemon import forward
+        request = {'cwd': os.getcwd(), 'commands': commands, 'run': lines, 'width': width, 'no_color': args['no_color'], 'stats': args['stats']}
+        forwarded = forward(config.get('daemon_socket', 'data/cocli.sock'), request, sys.stdout, sys.stderr)
+    failed = 0
+    if forwarded is None:
+        from data.terminal import parse_line
+        args_info = {x['name']: x for x in COMMANDS}
+        for command, arguments in commands + [parse_line(x, args_info) for x in lines]:
+            failed += not Helper.run_command(command, arguments)
+
+    batch_ok = 1
+    if args['batch']:
         shell = False
-        handle_command(command, arguments)
+        batch_ok = Helper.run_batch(args_raw['batch'])
+
+    if profiler:
+        profiler.disable()
+        Helper.dump_profile(profiler, args_raw['profile'])
+    if args['stats'] and forwarded is None:
+        print(collector.report(), file=sys.stderr)
+    if not batch_ok and not args['continue']:
+        exit(1)
+    if forwarded == 0 or (failed and not args['continue']):
+        # One of the commands failed, here or in the daemon
+        exit(1)
 
     if args['continue'] or shell:
         main()
\ No newline at end of file